@@ -5,11 +5,13 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from app.config.database import Base
+from app.config.database import Base, SQLALCHEMY_DATABASE_URL
 
 target_metadata = Base.metadata
 
 config = context.config
+# Migrate the database the app is configured for, not the URL in alembic.ini
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
 
 
 if config.config_file_name is not None:
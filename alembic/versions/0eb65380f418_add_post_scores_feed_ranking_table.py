@@ -0,0 +1,63 @@
+"""Add post_scores feed ranking table
+
+Revision ID: 0eb65380f418
+Revises: eed2d561d417
+Create Date: 2026-10-17 00:28:59.213423
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0eb65380f418'
+down_revision: Union[str, None] = 'eed2d561d417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'post_scores',
+        sa.Column('post_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('hot', sa.Float(), nullable=False),
+        sa.Column('top_day', sa.Integer(), nullable=True),
+        sa.Column('top_week', sa.Integer(), nullable=True),
+        sa.Column('refreshed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id')
+    )
+
+    # Score existing posts before the indexes exist (same formula as
+    # app.services.feed_scores.hot_score)
+    op.execute("""
+        INSERT INTO post_scores (post_id, score, created_at, hot, top_day, top_week)
+        SELECT
+            id,
+            votes_count,
+            created_at,
+            log(greatest(votes_count, 1)) + (extract(epoch FROM created_at) - 1577836800) / 45000,
+            CASE WHEN created_at >= now() - interval '1 day' THEN votes_count END,
+            CASE WHEN created_at >= now() - interval '7 days' THEN votes_count END
+        FROM posts
+    """)
+
+    op.create_index('ix_post_scores_hot', 'post_scores', ['hot', 'post_id'], unique=False)
+    op.create_index('ix_post_scores_score', 'post_scores', ['score', 'post_id'], unique=False)
+    op.create_index('ix_post_scores_top_day', 'post_scores', ['top_day', 'post_id'], unique=False, postgresql_where=sa.text('top_day IS NOT NULL'))
+    op.create_index('ix_post_scores_top_week', 'post_scores', ['top_week', 'post_id'], unique=False, postgresql_where=sa.text('top_week IS NOT NULL'))
+    op.create_index('ix_post_scores_window_created_at', 'post_scores', ['created_at'], unique=False, postgresql_where=sa.text('top_week IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_scores_window_created_at', table_name='post_scores', postgresql_where=sa.text('top_week IS NOT NULL'))
+    op.drop_index('ix_post_scores_top_week', table_name='post_scores', postgresql_where=sa.text('top_week IS NOT NULL'))
+    op.drop_index('ix_post_scores_top_day', table_name='post_scores', postgresql_where=sa.text('top_day IS NOT NULL'))
+    op.drop_index('ix_post_scores_score', table_name='post_scores')
+    op.drop_index('ix_post_scores_hot', table_name='post_scores')
+    op.drop_table('post_scores')
@@ -0,0 +1,34 @@
+"""Add posts owner_id and votes post_id indexes
+
+Revision ID: 185a22c3be61
+Revises: 0eb65380f418
+Create Date: 2026-10-17 00:45:50.072966
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '185a22c3be61'
+down_revision: Union[str, None] = '0eb65380f418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Foreign keys Postgres does not index on its own: cascading deletes of a
+    # user or post, owner filters and per-post vote lookups scan without them.
+    # votes_pkey leads with user_id, so it cannot serve post_id lookups.
+    # Built concurrently so writes to the tables are not blocked meanwhile.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_owner_id', 'posts', ['owner_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_votes_post_id', 'votes', ['post_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_votes_post_id', table_name='votes', postgresql_concurrently=True)
+        op.drop_index('ix_posts_owner_id', table_name='posts', postgresql_concurrently=True)
@@ -0,0 +1,26 @@
+"""Add posts (created_at, id) index
+
+Revision ID: 433183052e8c
+Revises: 59a57e1334b7
+Create Date: 2026-10-17 00:24:05.671920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '433183052e8c'
+down_revision: Union[str, None] = '59a57e1334b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
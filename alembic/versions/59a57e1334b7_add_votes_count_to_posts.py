@@ -0,0 +1,35 @@
+"""Add votes_count to posts
+
+Revision ID: 59a57e1334b7
+Revises: 95b62454cd39
+Create Date: 2026-10-17 00:10:42.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '59a57e1334b7'
+down_revision: Union[str, None] = '95b62454cd39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('votes_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    # Backfill the counter from the existing votes
+    op.execute(
+        """
+        UPDATE posts
+        SET votes_count = counts.votes
+        FROM (SELECT post_id, count(*) AS votes FROM votes GROUP BY post_id) AS counts
+        WHERE posts.id = counts.post_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'votes_count')
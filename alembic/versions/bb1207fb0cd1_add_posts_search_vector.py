@@ -0,0 +1,36 @@
+"""Add posts search_vector with GIN index
+
+Revision ID: bb1207fb0cd1
+Revises: 433183052e8c
+Create Date: 2026-10-17 00:41:27.503816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb1207fb0cd1'
+down_revision: Union[str, None] = '433183052e8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stored generated column: Postgres keeps it in step with title/content
+    # and fills it for existing rows (this rewrites the table once).
+    op.add_column('posts', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', title || ' ' || content)", persisted=True),
+        nullable=False
+    ))
+    op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_search_vector', table_name='posts', postgresql_using='gin')
+    op.drop_column('posts', 'search_vector')
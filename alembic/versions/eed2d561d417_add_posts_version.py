@@ -0,0 +1,27 @@
+"""Add posts version
+
+Revision ID: eed2d561d417
+Revises: bb1207fb0cd1
+Create Date: 2026-10-17 00:18:46.407852
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eed2d561d417'
+down_revision: Union[str, None] = 'bb1207fb0cd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant default: existing rows get version 1 without a table rewrite
+    op.add_column('posts', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'version')
@@ -0,0 +1,41 @@
+"""
+Export posts as newline-delimited JSON (one post per line, oldest first),
+streamed through a server-side cursor so memory use stays flat.
+
+Usage:
+    python -m app.cli.export_posts [--owner-id UUID] [--output posts.ndjson] [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import sys
+from uuid import UUID
+
+from app.config.database import ReplicaSessionLocal, engine, replica_engine
+from app.services.post_service import PostService
+
+
+async def export(output, owner_id, batch_size: int):
+    try:
+        async for chunk in PostService.export_posts(ReplicaSessionLocal, owner_id, batch_size):
+            output.write(chunk)
+    finally:
+        await replica_engine.dispose()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--owner-id", type=UUID, default=None, help="only this user's posts")
+    parser.add_argument("--output", default="-", help="file to write (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched per round trip")
+    args = parser.parse_args()
+
+    if args.output == "-":
+        asyncio.run(export(sys.stdout.buffer, args.owner_id, args.batch_size))
+    else:
+        with open(args.output, "wb") as output:
+            asyncio.run(export(output, args.owner_id, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Re-score every post in post_scores, e.g. after changing the ranking formula
+or to reconcile marks lost when a worker died before its next refresh.
+
+Usage:
+    python -m app.cli.rebuild_feed_scores [--batch-size 10000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.config.database import engine
+from app.services.feed_scores import feed_scores
+
+
+async def rebuild(batch_size: int) -> int:
+    try:
+        return await feed_scores.rebuild(batch_size)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000, help="posts re-scored per statement")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = asyncio.run(rebuild(args.batch_size))
+    print(f"Re-scored {total} posts in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
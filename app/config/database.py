@@ -1,7 +1,16 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import time
+from contextlib import asynccontextmanager
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session, declarative_base
 from app.config.settings import settings
+from app.utils.pool_metrics import PoolMetrics
+from app.utils.metrics import POOL_WAIT, record_query
+from app.utils.slow_query import SlowQueryLog
+from app.utils.cache import create_cache_backend
+from app.utils.write_marker import WriteMarker
 
 # ✅ PostgreSQL Connection URL
 SQLALCHEMY_DATABASE_URL = (
@@ -12,19 +21,200 @@ SQLALCHEMY_DATABASE_URL = (
     f"{settings.database_name}"
 )
 
-# ✅ Create SQLAlchemy Engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# ✅ Async driver variant of the same URL (asyncpg)
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace(
+    "postgresql://", "postgresql+asyncpg://", 1
+)
+
+# ✅ Replica URLs: same credentials and database on the replica host (if configured)
+REPLICA_CONFIGURED = settings.database_replica_hostname is not None
+ASYNC_REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.database_username}:"
+    f"{settings.database_password}@"
+    f"{settings.database_replica_hostname}:"
+    f"{settings.database_replica_port or settings.database_port}/"
+    f"{settings.database_name}"
+) if REPLICA_CONFIGURED else ASYNC_SQLALCHEMY_DATABASE_URL
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+    )
+
+def _instrument(engine) -> SlowQueryLog:
+    """
+    Times every statement on the engine, charges it to the current request
+    (if any) and logs slow statements as JSON, optionally with their plan.
+    """
+    slow_query_log = SlowQueryLog(
+        engine,
+        threshold_ms=settings.slow_query_threshold_ms,
+        explain=settings.slow_query_explain,
+        explain_interval=settings.slow_query_explain_interval_s,
+        explain_timeout_ms=settings.slow_query_explain_timeout_ms,
+    )
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        record_query(elapsed)
+        slow_query_log.observe(statement, parameters, executemany, elapsed)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(context):
+        # Failed statements never reach after_cursor_execute
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+    return slow_query_log
+
+# ✅ Create Async SQLAlchemy Engines (the replica engine is the primary when unset)
+engine = _create_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+slow_query_log = _instrument(engine)
+
+if REPLICA_CONFIGURED:
+    replica_engine = _create_engine(ASYNC_REPLICA_DATABASE_URL)
+    replica_slow_query_log = _instrument(replica_engine)
+else:
+    replica_engine = engine
+    replica_slow_query_log = slow_query_log
+
+# ✅ Pool wait/occupancy metrics for this worker (the replica's are the primary's when unset)
+pool_metrics = PoolMetrics(warning_ms=settings.database_pool_wait_warning_ms)
+replica_pool_metrics = (
+    PoolMetrics(warning_ms=settings.database_pool_wait_warning_ms) if REPLICA_CONFIGURED else pool_metrics
+)
 
-# ✅ Create Session Factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class TimedSession(Session):
+    """
+    Session that records how long each of its connection checkouts waited.
+
+    Connections are checked out on first use, so a request that never
+    queries (e.g. one answered from a cache) takes no pool slot at all.
+    """
+
+def _pool_of(sync_engine):
+    if REPLICA_CONFIGURED and sync_engine is replica_engine.sync_engine:
+        return replica_engine, replica_pool_metrics, "replica"
+    return engine, pool_metrics, "primary"
+
+@event.listens_for(TimedSession, "after_transaction_create")
+def _checkout_started(session, transaction):
+    # A transaction begins before the connection it needs is checked out
+    if transaction.parent is None:
+        session.info["checkout_started"] = time.perf_counter()
+
+@event.listens_for(TimedSession, "after_begin")
+def _checked_out(session, transaction, connection):
+    started = session.info.pop("checkout_started", None)
+    if started is None:
+        return
+    pool_engine, metrics, pool = _pool_of(connection.engine)
+    wait = time.perf_counter() - started
+    metrics.record_wait(wait * 1000, pool_engine.pool)
+    POOL_WAIT.labels(pool).observe(wait)
+
+# ✅ Create Async Session Factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=TimedSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_engine,
+    class_=AsyncSession,
+    sync_session_class=TimedSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# ✅ Clients that wrote recently read from the primary (read-your-writes)
+write_marker = WriteMarker(
+    create_cache_backend(
+        "memory" if settings.cache_backend == "none" else settings.cache_backend,
+        settings.cache_redis_url,
+        settings.cache_max_entries,
+        settings.read_your_writes_seconds,
+    ),
+    window=settings.read_your_writes_seconds,
+)
 
 # ✅ Base Class for Models
 Base = declarative_base()
 
+@asynccontextmanager
+async def _primary_session(request: Request):
+    """
+    The request's one primary session, opened by whichever dependency asks
+    for it first and shared with the others.
+    """
+    shared = getattr(request.state, "primary_db", None)
+    if shared is not None:
+        yield shared
+        return
+    async with AsyncSessionLocal() as db:
+        request.state.primary_db = db
+        try:
+            yield db
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+
 # ✅ Dependency for Getting DB Session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db(request: Request):
+    async with _primary_session(request) as db:
         yield db
-    finally:
-        db.close()
+
+def writes(route) -> bool:
+    """
+    Whether the route takes a primary session (get_db); read-only routes such
+    as POST /posts/batch only take read sessions.
+    """
+    dependants = [route.dependant]
+    while dependants:
+        dependant = dependants.pop()
+        if dependant.call is get_db:
+            return True
+        dependants.extend(dependant.dependencies)
+    return False
+
+# ✅ Dependency for Getting a Read-Only DB Session
+async def get_read_db(request: Request):
+    """
+    Session for read-only work: on the replica, unless the client wrote within
+    the read-your-writes window (the session is then marked "pinned" and
+    should bypass shared caches too). On a route that also takes get_db,
+    reads share its primary session, so a write holds a single connection.
+    """
+    route = request.scope.get("route")
+    if route is not None and writes(route):
+        async with _primary_session(request) as db:
+            db.info["replica"] = False
+            db.info["pinned"] = False
+            yield db
+        return
+
+    pinned = REPLICA_CONFIGURED and await write_marker.recent(request.headers.get("authorization"))
+    on_replica = REPLICA_CONFIGURED and not pinned
+    session_factory = ReplicaSessionLocal if on_replica else AsyncSessionLocal
+    async with session_factory() as db:
+        db.info["replica"] = on_replica
+        db.info["pinned"] = pinned
+        try:
+            yield db
+        except PoolTimeoutError:
+            (replica_pool_metrics if on_replica else pool_metrics).record_timeout()
+            raise
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +11,72 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: int
 
+    # Connection pool (per worker process)
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30
+    database_pool_recycle: int = -1
+    database_pool_pre_ping: bool = False
+    database_pool_wait_warning_ms: float = 100
+
+    # Read replica for read-only endpoints (unset: reads use the primary). After a
+    # client writes, its reads stay on the primary for read_your_writes_seconds
+    # (tracked in the cache backend, which must then be "redis")
+    database_replica_hostname: Optional[str] = None
+    database_replica_port: Optional[str] = None
+    read_your_writes_seconds: float = 5
+
+    # Slow-query log: statements over the threshold (0 disables) are logged as JSON,
+    # optionally with an EXPLAIN plan captured in the background
+    slow_query_threshold_ms: float = 500
+    slow_query_explain: bool = False
+    slow_query_explain_interval_s: float = 60
+    slow_query_explain_timeout_ms: int = 10000
+
+    # Bearer token for the diagnostics endpoints (/internal/*, /metrics); unset hides them
+    internal_token: Optional[str] = None
+
+    # Run Base.metadata.create_all on startup (local development only; use Alembic otherwise)
+    database_create_schema: bool = False
+
+    # Remote debugger (debugpy), started on startup when enabled
+    debugger_enabled: bool = False
+    debugger_port: int = 5680
+
+    # Authenticated principal cache (per worker process)
+    auth_cache_ttl_seconds: float = 60
+    auth_cache_max_size: int = 10000
+
+    # bcrypt cost and the process pool that runs it (per worker process)
+    bcrypt_rounds: int = 12
+    bcrypt_workers: int = 2
+    bcrypt_max_queue: int = 32
+
+    # Write-behind vote buffering (POST /vote/ answers 202 and flushes in batches)
+    vote_buffer_enabled: bool = False
+    vote_buffer_max_batch: int = 500
+    vote_buffer_flush_interval_ms: int = 200
+    vote_buffer_max_pending: int = 10000
+
+    # Hot/top feed scores, re-scored from vote activity in batches (per worker process)
+    feed_refresh_interval_ms: int = 1000
+    feed_refresh_max_batch: int = 1000
+
+    # Live vote counts over WebSocket: updates are coalesced per tick and shared
+    # between workers through the bus, "memory" (single worker) or "redis".
+    # web_concurrency is the worker count (WEB_CONCURRENCY, also read by gunicorn)
+    vote_stream_tick_ms: int = 250
+    vote_stream_bus: str = "memory"
+    vote_stream_redis_url: str = "redis://localhost:6379/0"
+    vote_stream_max_posts: int = 100
+    web_concurrency: int = 1
+
+    # Response cache for post reads: "memory" (per worker), "redis" or "none"
+    cache_backend: str = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_ttl_seconds: float = 5
+    cache_max_entries: int = 10000
+
     class Config:
         env_file = ".env"
 
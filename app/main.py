@@ -1,19 +1,62 @@
-import debugpy
-import uvicorn
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import post, user, auth, vote
-from app.config.database import Base, engine
-import os
+from app.routers import post, user, auth, vote, internal, metrics
+from app.config.database import Base, engine, replica_engine, write_marker, writes, REPLICA_CONFIGURED
+from app.utils.security import password_pool
+from app.config.settings import settings
+from app.services.vote_buffer import vote_buffer
+from app.services.post_cache import post_cache
+from app.services.feed_scores import feed_scores
+from app.services.vote_stream import vote_stream
+from app.utils.metrics import QueryStats, current_query_stats, observe_request
 
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+def start_debugger():
+    # Imported here so workers that never debug don't pay for it
+    import debugpy
 
-if os.getenv("RUN_MAIN") == "true":
-    debugpy.listen(("0.0.0.0", 5680))
+    debugpy.listen(("0.0.0.0", settings.debugger_port))
     print("✅ Debugger attached. Waiting for connection...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.debugger_enabled:
+        start_debugger()
+    # Write markers must reach every worker, or a client's next read may hit
+    # a worker that sends it to the lagging replica
+    if REPLICA_CONFIGURED and settings.cache_backend != "redis":
+        raise RuntimeError("A read replica requires CACHE_BACKEND=redis to share read-your-writes markers")
+    # The in-process bus would only reach subscribers on the worker that saw the vote
+    if settings.web_concurrency > 1 and settings.vote_stream_bus == "memory":
+        raise RuntimeError("Several workers require VOTE_STREAM_BUS=redis to share live vote counts")
+    # Schema changes belong to Alembic; create_all is a local-development shortcut
+    if settings.database_create_schema:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+    if settings.vote_buffer_enabled:
+        vote_buffer.start()
+    feed_scores.start()
+    await vote_stream.start()
+    yield
+    if settings.vote_buffer_enabled:
+        await vote_buffer.stop()
+    await vote_stream.stop()
+    # After the vote buffer, whose last flush marks posts for re-scoring
+    await feed_scores.stop()
+    password_pool.shutdown()
+    await post_cache.backend.close()
+    await write_marker.backend.close()
+    await engine.dispose()
+    if REPLICA_CONFIGURED:
+        await replica_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
 origins = ["*"]
 
 app.add_middleware(
@@ -24,16 +67,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Times each request and charges it the SQL statements it ran.
+
+    The observation is made once the body has been sent, so streamed responses
+    are charged the statements their body iterator runs as well.
+    """
+    stats = QueryStats(request.scope)
+    token = current_query_stats.set(stats)
+    started = time.perf_counter()
+
+    def observe(status: int):
+        # Label by route template, never by raw path, to bound cardinality
+        observe_request(request.method, stats.route or "unmatched", status, started, stats)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe(500)
+        raise
+    finally:
+        current_query_stats.reset(token)
+
+    body = response.body_iterator
+
+    async def observed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            observe(response.status_code)
+
+    response.body_iterator = observed_body()
+    return response
+
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    """
+    Keeps a client's reads on the primary for a short while after it writes,
+    so it never reads a replica that has not caught up with its own change.
+    """
+    response = await call_next(request)
+    route = request.scope.get("route")
+    if (
+        REPLICA_CONFIGURED
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+        and route is not None
+        and writes(route)
+    ):
+        await write_marker.mark(request.headers.get("authorization"))
+    return response
+
+
 app.include_router(post.router)
 app.include_router(user.router)
 app.include_router(auth.router)
 app.include_router(vote.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to my FastAPI app"}
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,5 @@
+# Import every model so relationship() targets resolve whichever module is imported first
+from app.models.user import User
+from app.models.post import Post
+from app.models.vote import Vote
+from app.models.post_score import PostScore
@@ -1,10 +1,13 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, TIMESTAMP
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, Index, Computed, TIMESTAMP
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql.expression import text
 from app.config.database import Base
 
+# Text search configuration used for both the stored vector and the queries
+SEARCH_CONFIG = "english"
+
 class Post(Base):
     __tablename__ = "posts"
     
@@ -14,8 +17,24 @@ class Post(Base):
     published = Column(Boolean, server_default='TRUE', nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    votes_count = Column(Integer, nullable=False, server_default=text('0'))
+    # Bumped on every edit; ETags combine it with votes_count
+    version = Column(Integer, nullable=False, server_default=text('1'))
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', title || ' ' || content)", persisted=True),
+        nullable=False
+    ))
+
+    # Never lazy-load: queries that serialize the owner join it in explicitly
+    owner = relationship("User", back_populates="posts", lazy="raise")
 
-    owner = relationship("User", back_populates="posts")
+    __table_args__ = (
+        # Keyset pagination walks this index newest-first
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_owner_id", "owner_id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     def as_dict(self):
         """Convert object to dictionary for JSON serialization."""
@@ -26,5 +45,7 @@ class Post(Base):
             "published": self.published,
             "created_at": self.created_at,
             "owner_id": str(self.owner_id),
+            "votes_count": self.votes_count,
+            "version": self.version,
             "owner": self.owner.as_dict() if self.owner else None
         }
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index, TIMESTAMP, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.config.database import Base
+
+class PostScore(Base):
+    """
+    Precomputed feed rankings, one row per post, kept up to date by
+    app.services.feed_scores from vote activity.
+    """
+    __tablename__ = "post_scores"
+
+    post_id = Column(UUID(as_uuid=True), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    # Copies of posts.votes_count / posts.created_at as of the last refresh
+    score = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    hot = Column(Float, nullable=False)
+    # Score while the post is inside the window, NULL once it has aged out
+    top_day = Column(Integer)
+    top_week = Column(Integer)
+    refreshed_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    __table_args__ = (
+        # Each ranked feed is a backward range scan over one of these
+        Index("ix_post_scores_hot", "hot", "post_id"),
+        Index("ix_post_scores_score", "score", "post_id"),
+        Index("ix_post_scores_top_day", "top_day", "post_id", postgresql_where=text("top_day IS NOT NULL")),
+        Index("ix_post_scores_top_week", "top_week", "post_id", postgresql_where=text("top_week IS NOT NULL")),
+        # Finds the rows whose windows need expiring
+        Index("ix_post_scores_window_created_at", "created_at", postgresql_where=text("top_week IS NOT NULL")),
+    )
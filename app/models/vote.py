@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.config.database import Base
 
@@ -8,6 +8,11 @@ class Vote(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     post_id = Column(UUID(as_uuid=True), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        # The primary key leads with user_id; per-post lookups and cascades need this
+        Index("ix_votes_post_id", "post_id"),
+    )
+
     def as_dict(self):
         """Convert object to dictionary for JSON serialization."""
         return {
@@ -1,16 +1,40 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.config.database import get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_read_db, AsyncSessionLocal
+from app.config.settings import settings
 from app.models.user import User
 from app.services.auth_service import AuthService  
-from app.schemas.auth import TokenData
+from app.schemas.user import UserOut
+from app.utils.ttl_cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Authenticated users keyed on user id, so a valid token usually needs no query
+principal_cache = TTLCache(
+    maxsize=settings.auth_cache_max_size,
+    ttl=settings.auth_cache_ttl_seconds
+)
+
+def invalidate_principal(user_id):
+    """
+    Drops a cached user, e.g. after a bulk statement that bypasses ORM events.
+    """
+    principal_cache.pop(str(user_id))
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    invalidate_principal(target.id)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
     """
     Dependency function to get the current authenticated user.
+
+    The session checks a connection out only on a principal cache miss.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -19,9 +43,39 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
 
     token_data = AuthService.verify_access_token(token, credentials_exception)
-    user = db.query(User).filter(User.id == token_data.id).first()
+
+    principal = principal_cache.get(token_data.id)
+    if principal is not None:
+        return principal
+
+    query = select(User).filter(User.id == token_data.id)
+    user = (await db.execute(query)).scalars().first()
+
+    if user is None and db.info.get("replica") is True:
+        # A just-registered user may not have reached the replica yet
+        async with AsyncSessionLocal() as primary:
+            user = (await primary.execute(query)).scalars().first()
 
     if user is None:
         raise credentials_exception
 
-    return user
+    principal = UserOut.model_validate(user)
+    principal_cache.set(token_data.id, principal)
+    return principal
+
+def require_internal_token(authorization: Optional[str] = Header(None)):
+    """
+    Dependency guarding the diagnostics endpoints with INTERNAL_TOKEN.
+
+    They answer 404 while no token is configured, so they are not exposed by default.
+    """
+    if not settings.internal_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.internal_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
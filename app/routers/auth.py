@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.database import get_db
 from app.schemas.auth import Token
 from app.services.auth_service import AuthService
@@ -8,8 +8,8 @@ from app.services.auth_service import AuthService
 router = APIRouter(tags=['Authentication'])
 
 @router.post('/login', response_model=Token)
-def login(
+async def login(
     user_credentials: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    return AuthService.login(user_credentials, db)
+    return await AuthService.login(user_credentials, db)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+
+from app.config.database import engine, pool_metrics, replica_engine, replica_pool_metrics, REPLICA_CONFIGURED
+from app.services.vote_buffer import vote_buffer
+from app.services.feed_scores import feed_scores
+from app.services.vote_stream import vote_stream
+from app.oauth2 import require_internal_token
+
+router = APIRouter(
+    prefix="/internal",
+    tags=['Internal'],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_token)]
+)
+
+@router.get("/pool")
+async def pool_status():
+    """
+    Reports connection pool occupancy and checkout wait times for this worker,
+    with the replica's pool under "replica" when one is configured.
+    """
+    status = pool_metrics.snapshot(engine.pool)
+    if REPLICA_CONFIGURED:
+        status["replica"] = replica_pool_metrics.snapshot(replica_engine.pool)
+    return status
+
+@router.get("/vote-buffer")
+async def vote_buffer_status():
+    """
+    Reports write-behind vote buffer counters for this worker.
+    """
+    return vote_buffer.metrics()
+
+@router.get("/feed-scores")
+async def feed_scores_status():
+    """
+    Reports feed score refresher counters for this worker.
+    """
+    return feed_scores.metrics()
+
+@router.get("/vote-stream")
+async def vote_stream_status():
+    """
+    Reports live vote count subscriptions and deliveries for this worker.
+    """
+    return vote_stream.metrics()
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Response
+
+from app.utils.metrics import render_metrics
+from app.oauth2 import require_internal_token
+
+router = APIRouter(
+    tags=['Metrics'],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_token)]
+)
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint: route latency, queries and DB time per
+    request, and connection pool wait time.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from app.services.post_service import PostService
-from app.schemas.post import PostOut, PostCreate, PostUpdate, PostWithVotes
-from app.config.database import get_db
+from app.services.post_cache import post_cache, CachedResponse
+from app.services.post_loader import PostLoader, get_post_loader
+from app.schemas.post import PostOut, PostCreate, PostUpdate, PostBatch, PostWithVotes, FeedPost, dump_post_with_votes, dump_posts_with_votes, dump_feed_posts
+from app.config.database import get_db, get_read_db, ReplicaSessionLocal
+from app.utils.etag import post_etag, page_etag, etag_matches
 from app.oauth2 import get_current_user
 
 router = APIRouter(
@@ -13,62 +17,137 @@ router = APIRouter(
     tags=['Posts']
 )
 
+def _cached_response(cached: CachedResponse) -> Response:
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+@router.get("/export")
+async def export_posts(
+    current_user = Depends(get_current_user),
+    owner_id: Optional[UUID] = None
+):
+    """
+    Streams every post, or one owner's posts, as newline-delimited JSON,
+    oldest first. Exports read from the replica when one is configured.
+    """
+    return StreamingResponse(
+        PostService.export_posts(ReplicaSessionLocal, owner_id),
+        media_type="application/x-ndjson"
+    )
+
 @router.get("/{post_id}", response_model=PostWithVotes)
-def get_post(
+async def get_post(
     post_id: UUID,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Retrieves a single post.
+
+    Responses carry an ETag; a matching If-None-Match is answered with
+    304 Not Modified from the post's version and vote count alone.
     """
-    return PostService.get_post(post_id, db)
+    if if_none_match:
+        etag = await PostService.get_post_etag(post_id, db)
+        if etag is not None and etag_matches(if_none_match, etag):
+            return _not_modified(etag)
 
-@router.get("/", response_model=List[PostWithVotes])
-def get_posts(
-    db: Session = Depends(get_db),
+    # A client that just wrote reads past the cache, which may predate its write
+    key = await post_cache.post_key(post_id)
+    cached = None if db.info.get("pinned") else await post_cache.get(key)
+    if cached is None:
+        post = await PostService.get_post(post_id, db)
+        etag = post_etag(post["post"].version, post["votes"])
+        cached = await post_cache.set(key, dump_post_with_votes(post), {"ETag": etag}, replica=db.info.get("replica", False))
+    return _cached_response(cached)
+
+@router.get("/", response_model=List[FeedPost])
+async def get_posts(
+    db: AsyncSession = Depends(get_read_db),
     current_user = Depends(get_current_user),
     limit: int = 10, 
     skip: int = 0, 
-    search: Optional[str] = ""
+    search: Optional[str] = "",
+    cursor: Optional[str] = None,
+    sort: Literal["new", "hot", "top"] = "new",
+    window: Literal["day", "week", "all"] = "all",
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Retrieves all posts, newest first, or ranked with sort=hot / sort=top
+    (top within window=day, week or all).
+
+    Each post says whether the current user voted for it (voted_by_me), so
+    pages are cached per user.
+
+    When a full page is returned, the X-Next-Cursor header carries the cursor
+    for the following page. The page ETag covers each post's id, version,
+    vote count and voted_by_me, so If-None-Match is checked without loading
+    the posts.
+    """
+    if if_none_match:
+        etag = await PostService.get_posts_etag(db, limit, skip, search, cursor, sort, window, current_user.id)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+
+    key = await post_cache.posts_key(limit, skip, search, cursor, sort, window, current_user.id)
+    cached = None if db.info.get("pinned") else await post_cache.get(key)
+    if cached is None:
+        posts, next_cursor = await PostService.get_posts(db, limit, skip, search, cursor, sort, window, current_user.id)
+        headers = {"ETag": page_etag((p["post"].id, p["post"].version, p["votes"], p["voted_by_me"]) for p in posts)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        cached = await post_cache.set(key, dump_feed_posts(posts), headers, replica=db.info.get("replica", False))
+    return _cached_response(cached)
+
+@router.post("/batch", response_model=List[PostWithVotes])
+async def get_posts_batch(
+    batch: PostBatch,
+    loader: PostLoader = Depends(get_post_loader),
+    current_user = Depends(get_current_user)
 ):
     """
-    Retrieves all posts.
+    Retrieves up to 100 posts by id in a single query, in the order asked
+    for. Unknown ids are left out.
     """
-    return PostService.get_posts(db, limit, skip, search)
+    posts = await loader.load_many(list(dict.fromkeys(batch.ids)))
+    return Response(content=dump_posts_with_votes([post for post in posts if post is not None]), media_type="application/json")
 
 @router.post("/", response_model=PostOut, status_code=status.HTTP_201_CREATED)
-def create_post(
+async def create_post(
     post: PostCreate, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_db), 
     current_user = Depends(get_current_user)
 ):
     """
     Creates a new post.
     """
-    return PostService.create_post(post, db, current_user.id)
+    return await PostService.create_post(post, db, current_user.id)
 
 @router.put("/{post_id}", response_model=PostOut)
-def update_post(
+async def update_post(
     post_id: UUID,  
     updated_post: PostUpdate, 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_db), 
     current_user = Depends(get_current_user)
 ):
     """
     Updates a post.
     """
-    return PostService.update_post(post_id, updated_post, db, current_user.id)
+    return await PostService.update_post(post_id, updated_post, db, current_user.id)
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     post_id: UUID,  
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_db), 
     current_user = Depends(get_current_user)
 ):
     """
     Deletes a post.
     """
-    PostService.delete_post(post_id, db, current_user.id)
+    await PostService.delete_post(post_id, db, current_user.id)
     return {"message": "Post deleted successfully"}
 
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.services.user_service import UserService
 from app.schemas.user import UserOut, UserCreate
-from app.config.database import get_db
+from app.config.database import get_db, get_read_db
 
 router = APIRouter(
     prefix="/users",
@@ -12,15 +12,15 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Creates a new user.
     """
-    return UserService.create_user(user, db)
+    return await UserService.create_user(user, db)
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: UUID, db: Session = Depends(get_db)):
+async def get_user(user_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """
     Retrieves a user by ID.
     """
-    return UserService.get_user(user_id, db)
+    return await UserService.get_user(user_id, db)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+import asyncio
+from contextlib import suppress
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config.database import get_db
+from app.config.settings import settings
+from app.services.auth_service import AuthService
 from app.services.vote_service import VoteService
-from app.schemas.vote import VoteBase
+from app.services.vote_stream import vote_stream, Subscriber
+from app.schemas.vote import VoteBase, VoteStreamMessage
 from app.oauth2 import get_current_user
-from uuid import UUID
 
 router = APIRouter(
     prefix="/vote",
@@ -13,12 +17,74 @@ router = APIRouter(
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def vote(
+async def vote(
     vote_data: VoteBase,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     """
     Adds or removes a vote for a post.
+
+    With vote buffering enabled the toggle is accepted (202) and written in
+    the next batch instead; the session is then never used, so no connection
+    is checked out.
+    """
+    if settings.vote_buffer_enabled:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return await VoteService.enqueue_vote(vote_data, current_user.id)
+    return await VoteService.vote(vote_data, db, current_user.id)
+
+async def _send_updates(websocket: WebSocket, subscriber: Subscriber):
+    try:
+        while True:
+            await subscriber.ready.wait()
+            await websocket.send_json({"votes": subscriber.take()})
+    except (WebSocketDisconnect, RuntimeError):
+        # The client went away; the receive loop cleans up
+        pass
+
+@router.websocket("/stream")
+async def stream_votes(websocket: WebSocket, token: str = Query(...)):
     """
-    return VoteService.vote(vote_data, db, current_user.id)
+    Pushes vote counts of the posts the client watches, at most one message
+    per tick.
+
+    Authenticate with ?token=<access token>, then send
+    {"subscribe": [post_id, ...]} or {"unsubscribe": [post_id, ...]}; each is
+    acknowledged with {"watching": [post_id, ...]}. Updates arrive as
+    {"votes": {post_id: count, ...}}.
+    """
+    try:
+        AuthService.verify_access_token(token, HTTPException(status_code=status.HTTP_401_UNAUTHORIZED))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = Subscriber()
+    sender = asyncio.create_task(_send_updates(websocket, subscriber))
+    try:
+        while True:
+            try:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                if frame.get("text") is None:
+                    raise ValueError("Expected a text frame")
+                # Malformed JSON and invalid frames (a ValidationError) are both ValueErrors
+                message = VoteStreamMessage.model_validate_json(frame["text"])
+                if message.subscribe:
+                    vote_stream.subscribe(subscriber, message.subscribe)
+                if message.unsubscribe:
+                    vote_stream.unsubscribe(subscriber, message.unsubscribe)
+                await websocket.send_json({"watching": sorted(subscriber.post_ids)})
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        with suppress(asyncio.CancelledError):
+            await sender
+        vote_stream.unsubscribe(subscriber)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Type
+from functools import lru_cache, partial
 from datetime import datetime
 from uuid import UUID
 from app.schemas.user import UserOut
@@ -15,6 +16,12 @@ class PostCreate(PostBase):
 class PostUpdate(PostBase):
     pass
 
+# Most posts a single batch request may ask for
+MAX_BATCH_IDS = 100
+
+class PostBatch(BaseModel):
+    ids: List[UUID] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
 class PostOut(PostBase):
     id: UUID
     created_at: datetime
@@ -30,3 +37,55 @@ class PostWithVotes(BaseModel):
 
     class Config:
         from_attributes = True
+
+class FeedPost(PostWithVotes):
+    # Whether the requesting user has voted for the post
+    voted_by_me: bool
+
+# Built once at import so each response reuses the compiled serializer
+post_with_votes_adapter = TypeAdapter(PostWithVotes)
+posts_with_votes_adapter = TypeAdapter(List[PostWithVotes])
+feed_posts_adapter = TypeAdapter(List[FeedPost])
+
+@lru_cache
+def _nested_models(model: Type[BaseModel]) -> dict:
+    return {
+        name: field.annotation
+        for name, field in model.model_fields.items()
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel)
+    }
+
+def _construct(model: Type[BaseModel], source):
+    """
+    Builds `model` from a dict or ORM object without validating it.
+
+    Rows read back from the database already satisfy the schema, and
+    re-validating them (EmailStr in particular) dominates serialization time.
+    """
+    read = source.get if isinstance(source, dict) else partial(getattr, source)
+    nested = _nested_models(model)
+    values = {}
+    for name in model.model_fields:
+        value = read(name)
+        if name in nested and value is not None:
+            value = _construct(nested[name], value)
+        values[name] = value
+    return model.model_construct(**values)
+
+def dump_post_with_votes(post) -> bytes:
+    """
+    Serializes a {"post", "votes"} result (ORM post inside) to JSON bytes.
+    """
+    return post_with_votes_adapter.dump_json(_construct(PostWithVotes, post))
+
+def dump_posts_with_votes(posts) -> bytes:
+    """
+    Serializes a page of {"post", "votes"} results to JSON bytes.
+    """
+    return posts_with_votes_adapter.dump_json([_construct(PostWithVotes, post) for post in posts])
+
+def dump_feed_posts(posts) -> bytes:
+    """
+    Serializes a feed page of {"post", "votes", "voted_by_me"} results to JSON bytes.
+    """
+    return feed_posts_adapter.dump_json([_construct(FeedPost, post) for post in posts])
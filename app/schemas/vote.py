@@ -1,6 +1,11 @@
 from pydantic import BaseModel, conint
+from typing import List
 from uuid import UUID
 
 class VoteBase(BaseModel):
     post_id: UUID
     dir: conint(le=1)  # type: ignore
+
+class VoteStreamMessage(BaseModel):
+    subscribe: List[UUID] = []
+    unsubscribe: List[UUID] = []
@@ -1,7 +1,8 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -9,7 +10,7 @@ from app.config.settings import settings
 from app.schemas.auth import Token, TokenData
 from app.models.user import User
 from app.config.database import get_db
-from app.utils.security import verify_password
+from app.utils.security import verify_password_async
 
 
 SECRET_KEY = settings.secret_key
@@ -50,13 +51,14 @@ class AuthService:
             raise credentials_exception
 
     @staticmethod
-    def login(user_credentials: OAuth2PasswordRequestForm, db: Session = Depends(get_db)) -> Token:
+    async def login(user_credentials: OAuth2PasswordRequestForm, db: AsyncSession = Depends(get_db)) -> Token:
         """
         Authenticate user and return JWT token.
         """
-        user = db.query(User).filter(User.email == user_credentials.username).first()
+        result = await db.execute(select(User).filter(User.email == user_credentials.username))
+        user = result.scalars().first()
 
-        if not user or not verify_password(user_credentials.password, user.password):
+        if not user or not await verify_password_async(user_credentials.password, user.password):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid Credentials"
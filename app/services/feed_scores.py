@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from typing import Iterable
+from uuid import UUID
+from sqlalchemy import func, select, update, case, literal_column, any_, bindparam
+from sqlalchemy.dialects.postgresql import insert, ARRAY, UUID as PG_UUID
+
+from app.config.database import AsyncSessionLocal
+from app.config.settings import settings
+from app.models.post import Post
+from app.models.post_score import PostScore
+from app.services.post_cache import post_cache
+
+logger = logging.getLogger(__name__)
+
+# Hot ranking: every 10x more votes is worth HOT_DECAY_SECONDS of recency
+HOT_EPOCH = 1577836800  # 2020-01-01 UTC
+HOT_DECAY_SECONDS = 45000
+
+# Day/week windows only need trimming now and then, not on every refresh
+EXPIRE_INTERVAL_SECONDS = 60
+
+WINDOWS = {
+    "day": "1 day",
+    "week": "7 days",
+}
+
+
+def hot_score(votes, created_at):
+    """
+    SQL expression for the hot rank. It only changes when the vote count
+    does, so it is recomputed on vote activity rather than over time.
+    """
+    return (
+        func.log(func.greatest(votes, 1))
+        + (func.extract("epoch", created_at) - HOT_EPOCH) / HOT_DECAY_SECONDS
+    )
+
+
+def _window_score(window: str):
+    return case(
+        (Post.created_at >= func.now() - literal_column(f"interval '{WINDOWS[window]}'"), Post.votes_count),
+        else_=None,
+    )
+
+
+def refresh_statement(post_ids: list):
+    """
+    Recomputes the scores of `post_ids` in one set-based upsert.
+    """
+    rows = select(
+        Post.id,
+        Post.votes_count,
+        Post.created_at,
+        hot_score(Post.votes_count, Post.created_at),
+        _window_score("day"),
+        _window_score("week"),
+    ).filter(Post.id == any_(bindparam("post_ids", post_ids, type_=ARRAY(PG_UUID(as_uuid=True)))))
+
+    statement = insert(PostScore).from_select(
+        ["post_id", "score", "created_at", "hot", "top_day", "top_week"], rows
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[PostScore.post_id],
+        set_={
+            "score": statement.excluded.score,
+            "hot": statement.excluded.hot,
+            "top_day": statement.excluded.top_day,
+            "top_week": statement.excluded.top_week,
+            "refreshed_at": func.now(),
+        },
+    )
+
+
+def expire_statements() -> list:
+    """
+    Clears window scores of posts that have aged out of the window.
+    """
+    return [
+        update(PostScore)
+        .filter(
+            column.isnot(None),
+            PostScore.created_at < func.now() - literal_column(f"interval '{WINDOWS[window]}'"),
+        )
+        .values({column: None})
+        .execution_options(synchronize_session=False)
+        for window, column in (("day", PostScore.top_day), ("week", PostScore.top_week))
+    ]
+
+
+class FeedScoreRefresher:
+    """
+    Keeps post_scores in step with vote activity.
+
+    Writers mark the posts whose votes changed; every `interval` seconds the
+    marked posts are re-scored in batches of `max_batch`. Posts that left
+    the day/week windows are cleared every EXPIRE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, interval: float, max_batch: int, session_factory=AsyncSessionLocal):
+        self.interval = interval
+        self.max_batch = max_batch
+        self.session_factory = session_factory
+        self._pending = set()
+        self._refresh_lock = asyncio.Lock()
+        self._task = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._last_expired = time.monotonic()
+        self.refreshes = 0
+        self.refreshed_posts = 0
+        self.failed_refreshes = 0
+        self.last_refresh_ms = 0.0
+
+    def mark(self, post_ids: Iterable[UUID]):
+        """
+        Queues posts for re-scoring on the next refresh.
+        """
+        self._pending.update(post_ids)
+
+    async def refresh(self) -> int:
+        """
+        Re-scores the marked posts and expires window scores; returns the
+        number of posts re-scored.
+        """
+        async with self._refresh_lock:
+            expire = time.monotonic() - self._last_expired >= EXPIRE_INTERVAL_SECONDS
+            if not self._pending and not expire:
+                return 0
+
+            pending, self._pending = list(self._pending), set()
+            start = time.perf_counter()
+            expired = 0
+            try:
+                async with self.session_factory() as db:
+                    for offset in range(0, len(pending), self.max_batch):
+                        await db.execute(refresh_statement(pending[offset:offset + self.max_batch]))
+                    if expire:
+                        for statement in expire_statements():
+                            expired += (await db.execute(statement)).rowcount
+                    await db.commit()
+            except Exception:
+                self.failed_refreshes += 1
+                self._pending.update(pending)
+                logger.exception("Feed score refresh of %d posts failed", len(pending))
+                return 0
+
+            if expire:
+                self._last_expired = time.monotonic()
+            self.refreshes += 1
+            self.refreshed_posts += len(pending)
+            self.last_refresh_ms = (time.perf_counter() - start) * 1000
+            if pending or expired:
+                await post_cache.invalidate_lists()
+            return len(pending)
+
+    async def rebuild(self, batch_size: int = 10000) -> int:
+        """
+        Re-scores every post, walking posts by id in batches.
+        """
+        total, last_id = 0, None
+        while True:
+            async with self.session_factory() as db:
+                query = select(Post.id).order_by(Post.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.filter(Post.id > last_id)
+                post_ids = (await db.execute(query)).scalars().all()
+                if not post_ids:
+                    break
+                await db.execute(refresh_statement(post_ids))
+                await db.commit()
+            total += len(post_ids)
+            last_id = post_ids[-1]
+        async with self.session_factory() as db:
+            for statement in expire_statements():
+                await db.execute(statement)
+            await db.commit()
+        await post_cache.invalidate_lists()
+        return total
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.refresh()
+
+    def start(self):
+        if self._task is None:
+            # Bind the primitives to the loop that runs the refresher
+            self._refresh_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the periodic refresher after scoring whatever is still marked.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.refresh()
+
+    def metrics(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "refreshes": self.refreshes,
+            "refreshed_posts": self.refreshed_posts,
+            "failed_refreshes": self.failed_refreshes,
+            "last_refresh_ms": round(self.last_refresh_ms, 3),
+        }
+
+
+feed_scores = FeedScoreRefresher(
+    interval=settings.feed_refresh_interval_ms / 1000,
+    max_batch=settings.feed_refresh_max_batch
+)
@@ -0,0 +1,122 @@
+import hashlib
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID, uuid4
+
+import orjson
+
+from app.config.settings import settings
+from app.utils.cache import CacheBackend, create_cache_backend
+
+# Bumped on every write that can change a feed page; list keys embed it, so
+# one INCR retires every cached page at once.
+LIST_GENERATION_KEY = "posts:list-generation"
+
+# Set for the replica lag window after a write; while present, responses read
+# from the replica are not cached, as the replica may not have the write yet.
+LIST_WRITTEN_KEY = "posts:list-written"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict
+
+
+def _pack(response: CachedResponse) -> bytes:
+    return orjson.dumps(response.headers) + b"\n" + response.body
+
+
+def _unpack(raw: bytes) -> CachedResponse:
+    headers, body = raw.split(b"\n", 1)
+    return CachedResponse(body=body, headers=orjson.loads(headers))
+
+
+class PostCache:
+    """
+    Serialized GET /posts responses, keyed per post and per feed page.
+
+    Both kinds of key embed a generation that writes replace, so a response
+    read before a write and stored after it lands under a key nobody reads.
+
+    With a read replica, `replica_lag` is the read-your-writes window: for that
+    long after an invalidation, responses read from the replica are served but
+    not stored.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, replica_lag: float = 0):
+        self.backend = backend
+        self.ttl = ttl
+        self.replica_lag = replica_lag
+
+    @staticmethod
+    def _post_generation_key(post_id: UUID) -> str:
+        return f"post-generation:{post_id}"
+
+    async def post_key(self, post_id: UUID) -> str:
+        """
+        Key for one post, scoped to the post's current generation.
+        """
+        generation = await self.backend.get(self._post_generation_key(post_id)) or b"0"
+        return f"post:{post_id}:{generation.decode()}"
+
+    @staticmethod
+    def written_key(key: str) -> str:
+        # Feed pages share one marker, as a write retires all of them; a
+        # post's marker covers every generation of its key
+        return LIST_WRITTEN_KEY if key.startswith("posts:") else f"written:{key.rsplit(':', 1)[0]}"
+
+    async def posts_key(self, *params) -> str:
+        """
+        Key for one feed page, scoped to the current list generation.
+        """
+        generation = await self.backend.get(LIST_GENERATION_KEY) or b"0"
+        digest = hashlib.blake2b(orjson.dumps(params, default=str), digest_size=16).hexdigest()
+        return f"posts:{generation.decode()}:{digest}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        raw = await self.backend.get(key)
+        return _unpack(raw) if raw is not None else None
+
+    async def set(self, key: str, body: bytes, headers: dict = None, replica: bool = False) -> CachedResponse:
+        """
+        Stores the response, unless it was read from the replica within the
+        lag window of a write to it.
+        """
+        response = CachedResponse(body=body, headers=headers or {})
+        if replica and self.replica_lag > 0 and await self.backend.get(self.written_key(key)) is not None:
+            return response
+        await self.backend.set(key, _pack(response), self.ttl)
+        return response
+
+    async def _mark_written(self, *keys: str):
+        if self.replica_lag > 0:
+            for key in keys:
+                await self.backend.set(self.written_key(key), b"1", self.replica_lag)
+
+    async def invalidate_lists(self):
+        await self._mark_written(LIST_GENERATION_KEY)
+        await self.backend.incr(LIST_GENERATION_KEY)
+
+    async def invalidate_posts(self, post_ids: Iterable[UUID]):
+        """
+        Retires the cached posts and every cached feed page.
+
+        Post generations are random rather than counted so they can expire:
+        outliving every entry stored under the previous generation, a lapsed
+        generation falls back to a key that no longer holds anything.
+        """
+        for post_id in post_ids:
+            await self._mark_written(f"post:{post_id}:")
+            await self.backend.set(self._post_generation_key(post_id), uuid4().hex.encode(), self.ttl * 2)
+        await self.invalidate_lists()
+
+
+post_cache = PostCache(
+    backend=create_cache_backend(
+        settings.cache_backend,
+        settings.cache_redis_url,
+        settings.cache_max_entries,
+        settings.cache_ttl_seconds
+    ),
+    ttl=settings.cache_ttl_seconds,
+    replica_lag=settings.read_your_writes_seconds if settings.database_replica_hostname else 0
+)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Optional
+from uuid import UUID
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_read_db
+from app.services.post_service import PostService
+
+logger = logging.getLogger(__name__)
+
+
+class PostLoader:
+    """
+    Request-scoped post loader.
+
+    Lookups made in the same event-loop tick (e.g. under asyncio.gather)
+    are merged into a single `IN (...)` query, and every post loaded is
+    remembered for the rest of the request.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._loaded = {}
+        self._pending = {}
+        # Dispatch tasks in flight; the loop only keeps weak references to tasks
+        self._dispatches = set()
+        # The session runs one statement at a time
+        self._lock = asyncio.Lock()
+
+    async def load(self, post_id: UUID) -> Optional[dict]:
+        """
+        The {"post", "votes"} result for `post_id`, or None if it doesn't exist.
+        """
+        if post_id in self._loaded:
+            return self._loaded[post_id]
+
+        future = self._pending.get(post_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # Runs on the next tick, once concurrent callers have queued their ids
+                task = loop.create_task(self._dispatch())
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatched)
+            future = self._pending[post_id] = loop.create_future()
+        return await future
+
+    async def load_many(self, post_ids: list) -> list:
+        """
+        Results for `post_ids` in order, with None for unknown ids.
+        """
+        return list(await asyncio.gather(*(self.load(post_id) for post_id in post_ids)))
+
+    def _dispatched(self, task: asyncio.Task):
+        self._dispatches.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Post loader dispatch failed", exc_info=task.exception())
+
+    async def _dispatch(self):
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                posts = await PostService.get_posts_by_ids(list(batch), self.db)
+            except Exception as e:
+                for future in batch.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            found = {post["post"].id: post for post in posts}
+            for post_id, future in batch.items():
+                self._loaded[post_id] = found.get(post_id)
+                if not future.done():
+                    future.set_result(found.get(post_id))
+
+
+def get_post_loader(db: AsyncSession = Depends(get_read_db)) -> PostLoader:
+    """
+    Dependency giving each request its own PostLoader on the read session.
+    """
+    return PostLoader(db)
@@ -1,97 +1,367 @@
+import re
+import orjson
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import AsyncIterator, Optional
 from uuid import UUID
-from app.models.post import Post
-from app.schemas.post import PostCreate, PostUpdate
+from app.models.post import Post, SEARCH_CONFIG
+from app.models.post_score import PostScore
 from app.models.vote import Vote
-from sqlalchemy import func
+from app.schemas.post import PostCreate, PostUpdate
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.etag import post_etag, page_etag
+from app.services.post_cache import post_cache
+from app.services.feed_scores import feed_scores
+from sqlalchemy import func, select, update, delete, tuple_, false
+from sqlalchemy.orm import aliased, contains_eager, joinedload
+
+# Ranked feeds: (sort, window) -> precomputed score column
+FEED_SCORES = {
+    ("hot", "all"): PostScore.hot,
+    ("top", "all"): PostScore.score,
+    ("top", "day"): PostScore.top_day,
+    ("top", "week"): PostScore.top_week,
+}
+
+# Every loaded column of a post (search_vector is deferred), returned by UPDATE
+UPDATE_RETURNING = [column for column in Post.__table__.columns if column.key != "search_vector"]
+
+# Flat columns written per post by the NDJSON export
+EXPORT_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.content,
+    Post.published,
+    Post.created_at,
+    Post.owner_id,
+    Post.votes_count.label("votes"),
+    Post.version,
+)
 
 class PostService:
     @staticmethod
-    def create_post(post: PostCreate, db: Session, current_user_id: UUID):
+    def _select_posts(*columns):
+        """
+        Post query with the owner joined in, so serializing PostOut needs no
+        extra query per post.
+        """
+        return select(Post, *columns).options(joinedload(Post.owner, innerjoin=True))
+
+    @staticmethod
+    async def _load_post(post_id: UUID, db: AsyncSession) -> Optional[Post]:
+        """
+        Loads (or reloads, after a write) a post together with its owner.
+        """
+        result = await db.execute(
+            PostService._select_posts()
+            .filter(Post.id == post_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_post(post: PostCreate, db: AsyncSession, current_user_id: UUID):
         """
         Creates a new post.
         """
         new_post = Post(owner_id=current_user_id, **post.model_dump())
         db.add(new_post)
-        db.commit()
-        db.refresh(new_post)
+        await db.commit()
+        new_post = await PostService._load_post(new_post.id, db)
+        feed_scores.mark([new_post.id])
+        await post_cache.invalidate_lists()
         return new_post
 
     @staticmethod
-    def update_post(post_id: UUID, updated_post: PostUpdate, db: Session, current_user_id: UUID):
+    async def _raise_not_owned(post_id: UUID, db: AsyncSession, action: str):
         """
-        Updates a post if the user is the owner.
+        Called when an owner-scoped write matched nothing: 404 if the post
+        doesn't exist, 403 if it belongs to someone else.
         """
-        post_query = db.query(Post).filter(Post.id == post_id)
-        post = post_query.first()
-
-        if post is None:
+        result = await db.execute(select(Post.owner_id).filter(Post.id == post_id))
+        if result.scalars().first() is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Post with id {post_id} does not exist"
             )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this post"
+        )
 
-        if post.owner_id != current_user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to update this post"
-            )
+    @staticmethod
+    async def update_post(post_id: UUID, updated_post: PostUpdate, db: AsyncSession, current_user_id: UUID):
+        """
+        Updates a post if the user is the owner.
+
+        The ownership check is part of the UPDATE, which returns the new row
+        joined to its owner, so an edit is one round trip with no window
+        between check and write.
+        """
+        updated = (
+            update(Post)
+            .filter(Post.id == post_id, Post.owner_id == current_user_id)
+            .values(**updated_post.model_dump(), version=Post.version + 1)
+            .returning(*UPDATE_RETURNING)
+            .cte("updated_post")
+        )
+        # The main query can't see the CTE's write in posts, so read the RETURNING row
+        updated_post_row = aliased(Post, updated)
+        result = await db.execute(
+            select(updated_post_row)
+            .join(updated_post_row.owner)
+            .options(contains_eager(updated_post_row.owner))
+            .execution_options(populate_existing=True)
+        )
+        post = result.scalars().first()
+
+        if post is None:
+            await PostService._raise_not_owned(post_id, db, "update")
 
-        post_query.update(updated_post.model_dump(), synchronize_session=False)
-        db.commit()
-        return post_query.first()
+        await db.commit()
+        await post_cache.invalidate_posts([post_id])
+        return post
 
     @staticmethod
-    def delete_post(post_id: UUID, db: Session, current_user_id: UUID):
+    async def delete_post(post_id: UUID, db: AsyncSession, current_user_id: UUID):
         """
-        Deletes a post if the user is the owner.
+        Deletes a post if the user is the owner, checked by the DELETE itself.
         """
-        post_query = db.query(Post).filter(Post.id == post_id)
-        post = post_query.first()
+        result = await db.execute(
+            delete(Post)
+            .filter(Post.id == post_id, Post.owner_id == current_user_id)
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
 
-        if post is None:
+        if result.scalars().first() is None:
+            await PostService._raise_not_owned(post_id, db, "delete")
+
+        await db.commit()
+        await post_cache.invalidate_posts([post_id])
+
+    @staticmethod
+    async def get_post(post_id: UUID, db: AsyncSession):
+        """
+        Retrieves a single post.
+        """
+        post = await PostService._load_post(post_id, db)
+
+        if not post:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Post with id {post_id} does not exist"
+                detail=f"Post with id {post_id} not found"
             )
 
-        if post.owner_id != current_user_id:
+        return {"post": post, "votes": post.votes_count}
+
+    @staticmethod
+    async def get_posts_by_ids(post_ids: list, db: AsyncSession) -> list:
+        """
+        Retrieves the given posts, with owners and vote counts, in one query.
+
+        Results follow the order of `post_ids`; unknown ids are left out and
+        repeated ids are returned once.
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return []
+
+        result = await db.execute(PostService._select_posts().filter(Post.id.in_(post_ids)))
+        posts = {post.id: post for post in result.scalars()}
+        return [{"post": posts[post_id], "votes": posts[post_id].votes_count} for post_id in post_ids if post_id in posts]
+
+    @staticmethod
+    def _search_query(search: str):
+        """
+        Builds a tsquery matching every word of `search`, each as a prefix.
+        """
+        terms = re.findall(r"\w+", search)
+        if not terms:
+            return None
+        return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+
+    @staticmethod
+    def _parse_cursor(cursor: str, converters: tuple) -> tuple:
+        """
+        Decodes a cursor and converts each value back to its column type.
+        """
+        values = decode_cursor(cursor, len(converters))
+        try:
+            return tuple(convert(value) for convert, value in zip(converters, values))
+        except (TypeError, ValueError, AttributeError):
+            # e.g. UUID(5) raises AttributeError rather than TypeError
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to delete this post"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
             )
 
-        post_query.delete(synchronize_session=False)
-        db.commit()
-
     @staticmethod
-    def get_post(post_id: UUID, db: Session):
+    def _voted_by(viewer_id: Optional[UUID]):
         """
-        Retrieves a single post.
+        Column telling whether `viewer_id` voted for each post: a semi-join on
+        the votes primary key that Postgres evaluates for the page's rows only.
         """
-        post = db.query(Post, func.count(Vote.post_id).label("votes")) \
-                .join(Vote, Vote.post_id == Post.id, isouter=True) \
-                .group_by(Post.id) \
-                .filter(Post.id == post_id).first()
+        if viewer_id is None:
+            return false().label("voted_by_me")
+        return (
+            select(Vote.post_id)
+            .filter(Vote.post_id == Post.id, Vote.user_id == viewer_id)
+            .exists()
+            .label("voted_by_me")
+        )
 
-        if not post:
+    @staticmethod
+    def _page_query(columns: list, limit: int, skip: int, search: str, cursor: Optional[str], sort: str = "new", window: str = "all"):
+        """
+        Selects `columns` for one feed page: search filter or ranking, ordering
+        and paging.
+
+        The sort keys are appended to the selected columns, so the cursor for
+        the next page is `row[len(columns):]`. Returns None when `search`
+        contains no words.
+        """
+        if search and sort != "new":
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Post with id {post_id} not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search results are ordered by relevance and cannot be sorted"
+            )
+        if window != "all" and sort != "top":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A window only applies to sort=top"
             )
-        
-        return {"post": post[0], "votes": post[1]}
+
+        sort_keys = [Post.created_at, Post.id]
+        converters = (datetime.fromisoformat, UUID)
+
+        if search:
+            ts_query = PostService._search_query(search)
+            if ts_query is None:
+                return None
+            sort_keys.insert(0, func.ts_rank(Post.search_vector, ts_query))
+            converters = (float,) + converters
+            query = select(*columns, *sort_keys).filter(Post.search_vector.op("@@")(ts_query))
+        elif sort != "new":
+            # Ranked feeds are range scans over the precomputed post_scores indexes
+            score = FEED_SCORES[sort, window]
+            sort_keys = [score, PostScore.post_id]
+            converters = (float if sort == "hot" else int, UUID)
+            query = (
+                select(*columns, *sort_keys)
+                .join(PostScore, PostScore.post_id == Post.id)
+                .filter(score.isnot(None))
+            )
+        else:
+            query = select(*columns, *sort_keys)
+
+        query = query.order_by(*(key.desc() for key in sort_keys))
+
+        if cursor:
+            key = PostService._parse_cursor(cursor, converters)
+            query = query.filter(tuple_(*sort_keys) < key)
+        else:
+            query = query.offset(skip)
+
+        return query.limit(limit)
+
+    @staticmethod
+    async def get_posts(
+        db: AsyncSession,
+        limit: int,
+        skip: int,
+        search: str,
+        cursor: Optional[str] = None,
+        sort: str = "new",
+        window: str = "all",
+        viewer_id: Optional[UUID] = None
+    ):
+        """
+        Retrieves multiple posts, newest first.
+
+        With `search`, only posts whose title or content match are returned,
+        best match first (ranked with ts_rank over the indexed search_vector).
+        Otherwise `sort` may pick a ranked feed: "hot" (votes decayed by age)
+        or "top" within `window` ("day", "week" or "all"), read from the
+        precomputed post_scores table.
+
+        Pages are keyed on the sort order: pass the returned next_cursor back
+        as `cursor` to continue after the last post. `skip` is still honoured
+        when no cursor is given.
+
+        Each result's `voted_by_me` says whether `viewer_id` voted for the
+        post, computed in the same statement.
+        """
+        columns = [Post, PostService._voted_by(viewer_id)]
+        query = PostService._page_query(columns, limit, skip, search, cursor, sort, window)
+        if query is None:
+            return [], None
+
+        result = await db.execute(query.options(joinedload(Post.owner, innerjoin=True)))
+        rows = result.all()
+
+        next_cursor = None
+        if rows and len(rows) == limit:
+            next_cursor = encode_cursor(*rows[-1][len(columns):])
+
+        return [
+            {"post": row[0], "votes": row[0].votes_count, "voted_by_me": row[1]}
+            for row in rows
+        ], next_cursor
 
     @staticmethod
-    def get_posts(db: Session, limit: int, skip: int, search: str):
+    async def get_post_etag(post_id: UUID, db: AsyncSession) -> Optional[str]:
         """
-        Retrieves multiple posts.
+        ETag of a single post, read from its version and vote count only.
+        """
+        result = await db.execute(select(Post.version, Post.votes_count).filter(Post.id == post_id))
+        row = result.first()
+        return post_etag(*row) if row else None
+
+    @staticmethod
+    async def get_posts_etag(
+        db: AsyncSession,
+        limit: int,
+        skip: int,
+        search: str,
+        cursor: Optional[str] = None,
+        sort: str = "new",
+        window: str = "all",
+        viewer_id: Optional[UUID] = None
+    ) -> str:
+        """
+        ETag of a feed page, from the same query as get_posts but selecting
+        only the columns the tag covers.
+        """
+        columns = [Post.id, Post.version, Post.votes_count, PostService._voted_by(viewer_id)]
+        query = PostService._page_query(columns, limit, skip, search, cursor, sort, window)
+        if query is None:
+            return page_etag([])
+
+        result = await db.execute(query)
+        return page_etag(row[:len(columns)] for row in result.all())
+
+    @staticmethod
+    async def export_posts(session_factory, owner_id: Optional[UUID] = None, batch_size: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Streams posts (all of them, or one owner's) as NDJSON, oldest first,
+        one chunk per batch of rows.
+
+        Rows are fetched through a server-side cursor (`yield_per`), so memory
+        stays at one batch however many posts there are. The session is opened
+        here because it has to live as long as the response body does.
         """
-        posts = db.query(Post, func.count(Vote.post_id).label("votes")) \
-                .join(Vote, Vote.post_id == Post.id, isouter=True) \
-                .group_by(Post.id) \
-                .filter(Post.title.contains(search)) \
-                .limit(limit).offset(skip).all()
+        query = (
+            select(*EXPORT_COLUMNS)
+            .order_by(Post.created_at, Post.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if owner_id is not None:
+            query = query.filter(Post.owner_id == owner_id)
 
-        return [{"post": post[0], "votes": post[1]} for post in posts]
+        async with session_factory() as db:
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                # asyncpg hands back its own UUID type, which orjson leaves to `default`
+                yield b"".join(orjson.dumps(row._asdict(), default=str) + b"\n" for row in rows)
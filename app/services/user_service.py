@@ -1,32 +1,34 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.utils.hashing import hash_password
+from app.utils.security import hash_password_async
 
 class UserService:
     @staticmethod
-    def create_user(user_data: UserCreate, db: Session):
+    async def create_user(user_data: UserCreate, db: AsyncSession):
         """
         Creates a new user.
         """
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
         user_data_dict = user_data.model_dump()
         user_data_dict["password"] = hashed_password
 
         new_user = User(**user_data_dict)
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         return new_user
 
     @staticmethod
-    def get_user(user_id: UUID, db: Session):
+    async def get_user(user_id: UUID, db: AsyncSession):
         """
         Retrieves a user by ID.
         """
-        user = db.query(User).filter(User.id == user_id).first()
+        result = await db.execute(select(User).filter(User.id == user_id))
+        user = result.scalars().first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
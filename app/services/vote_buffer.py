@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.types import Integer
+
+from app.config.database import AsyncSessionLocal
+from app.config.settings import settings
+from app.services.post_cache import post_cache
+from app.services.feed_scores import feed_scores
+from app.services.vote_stream import vote_stream
+
+logger = logging.getLogger(__name__)
+
+# Applies a whole batch of vote toggles in one statement. Rows whose post or
+# user no longer exists are skipped by the joins instead of failing the batch.
+FLUSH_STATEMENT = text(
+    """
+    WITH batch AS (
+        SELECT * FROM unnest(:user_ids, :post_ids, :dirs) AS b(user_id, post_id, dir)
+    ),
+    inserted AS (
+        INSERT INTO votes (user_id, post_id)
+        SELECT b.user_id, b.post_id
+        FROM batch b
+        JOIN posts p ON p.id = b.post_id
+        JOIN users u ON u.id = b.user_id
+        WHERE b.dir = 1
+        ON CONFLICT DO NOTHING
+        RETURNING post_id
+    ),
+    deleted AS (
+        DELETE FROM votes v
+        USING batch b
+        WHERE b.dir <> 1 AND v.user_id = b.user_id AND v.post_id = b.post_id
+        RETURNING v.post_id
+    ),
+    deltas AS (
+        SELECT post_id, sum(delta) AS delta
+        FROM (
+            SELECT post_id, 1 AS delta FROM inserted
+            UNION ALL
+            SELECT post_id, -1 AS delta FROM deleted
+        ) AS changes
+        GROUP BY post_id
+    )
+    UPDATE posts
+    SET votes_count = posts.votes_count + deltas.delta
+    FROM deltas
+    WHERE posts.id = deltas.post_id
+    RETURNING posts.id, posts.votes_count
+    """
+).bindparams(
+    bindparam("user_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("post_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("dirs", type_=ARRAY(Integer)),
+)
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for vote toggles.
+
+    Toggles are kept per (user_id, post_id), so repeated clicks collapse
+    into the user's latest intent. The buffer is flushed with a single
+    statement when it reaches `max_batch` entries, every `flush_interval`
+    seconds, and on shutdown.
+
+    At most `max_pending` toggles are held; while the database cannot keep up,
+    new toggles get an immediate 503 instead of growing the buffer without bound.
+    """
+
+    def __init__(self, max_batch: int, flush_interval: float, max_pending: int = 10000,
+                 session_factory=AsyncSessionLocal):
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._pending = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._stopping = False
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_votes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    async def add(self, user_id: UUID, post_id: UUID, dir: int):
+        """
+        Records the user's latest vote intent for the post.
+        """
+        key = (user_id, post_id)
+        if key in self._pending:
+            self.deduplicated += 1
+        elif len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            self._wakeup.set()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        self._pending[key] = 1 if dir == 1 else 0
+        self.enqueued += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self) -> list:
+        """
+        Writes everything buffered so far; returns (post_id, votes_count) rows
+        for the posts whose count changed.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return []
+
+            batch, self._pending = self._pending, {}
+            keys = list(batch)
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as db:
+                    result = await db.execute(FLUSH_STATEMENT, {
+                        "user_ids": [user_id for user_id, _ in keys],
+                        "post_ids": [post_id for _, post_id in keys],
+                        "dirs": [batch[key] for key in keys],
+                    })
+                    changed = result.all()
+                    await db.commit()
+            except Exception:
+                # Keep the votes for the next flush, without overriding newer clicks
+                self.failed_flushes += 1
+                for key, dir in batch.items():
+                    self._pending.setdefault(key, dir)
+                logger.exception("Vote buffer flush of %d votes failed", len(batch))
+                return []
+
+            self.flushes += 1
+            self.flushed_votes += len(batch)
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            if changed:
+                feed_scores.mark(post_id for post_id, _ in changed)
+                vote_stream.mark(post_id for post_id, _ in changed)
+                await post_cache.invalidate_posts(post_id for post_id, _ in changed)
+            return changed
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            # Bind the primitives to the loop that runs the flusher
+            self._flush_lock = asyncio.Lock()
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the periodic flusher and writes out whatever is still buffered.
+        """
+        if self._task is not None:
+            # Let the flusher finish its current batch rather than cancelling it
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "flushed_votes": self.flushed_votes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+
+
+vote_buffer = VoteBuffer(
+    max_batch=settings.vote_buffer_max_batch,
+    flush_interval=settings.vote_buffer_flush_interval_ms / 1000,
+    max_pending=settings.vote_buffer_max_pending
+)
@@ -1,45 +1,123 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.models.vote import Vote
 from app.models.post import Post
 from app.schemas.vote import VoteBase
+from app.services.vote_buffer import vote_buffer
+from app.services.post_cache import post_cache
+from app.services.feed_scores import feed_scores
+from app.services.vote_stream import vote_stream
+from app.oauth2 import invalidate_principal
+
+# Foreign keys of votes, as named by Postgres
+POST_FOREIGN_KEY = "votes_post_id_fkey"
+USER_FOREIGN_KEY = "votes_user_id_fkey"
+
+def _constraint_name(error: IntegrityError):
+    """
+    Name of the violated constraint; asyncpg reports it on the driver exception
+    the DBAPI error wraps.
+    """
+    for candidate in (error.orig, getattr(error.orig, "__cause__", None)):
+        name = getattr(candidate, "constraint_name", None)
+        if name:
+            return name
+    return None
 
 class VoteService:
     @staticmethod
-    def vote(vote_data: VoteBase, db: Session, user_id: UUID):
+    def _toggle_statement(post_id: UUID, user_id: UUID, dir: int):
         """
-        Handles upvoting and removing votes from a post.
+        One statement that adds (dir == 1) or removes the vote and moves
+        posts.votes_count with it, returning the new count.
+
+        The vote change runs in a data-modifying CTE; the counter is only
+        touched when that CTE actually inserted/deleted a row, so an existing
+        vote (ON CONFLICT DO NOTHING) or a missing one returns no row.
         """
-        post = db.query(Post).filter(Post.id == vote_data.post_id).first()
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Post with id {vote_data.post_id} does not exist"
+        if dir == 1:
+            changed = (
+                insert(Vote)
+                .values(post_id=post_id, user_id=user_id)
+                .on_conflict_do_nothing(index_elements=[Vote.user_id, Vote.post_id])
+                .returning(Vote.post_id)
+                .cte("changed_vote")
+            )
+            delta = 1
+        else:
+            changed = (
+                delete(Vote)
+                .filter(Vote.post_id == post_id, Vote.user_id == user_id)
+                .returning(Vote.post_id)
+                .cte("changed_vote")
             )
+            delta = -1
 
-        vote_query = db.query(Vote).filter(
-            Vote.post_id == vote_data.post_id, Vote.user_id == str(user_id)  
+        return (
+            update(Post)
+            .filter(Post.id.in_(select(changed.c.post_id)))
+            .values(votes_count=Post.votes_count + delta)
+            .returning(Post.votes_count)
+            .execution_options(synchronize_session=False)
         )
-        sample_query = vote_query.all()
-        found_vote = vote_query.first()
+
+    @staticmethod
+    async def vote(vote_data: VoteBase, db: AsyncSession, user_id: UUID):
+        """
+        Handles upvoting and removing votes from a post.
+        """
+        statement = VoteService._toggle_statement(vote_data.post_id, user_id, vote_data.dir)
+        try:
+            result = await db.execute(statement)
+        except IntegrityError as e:
+            await db.rollback()
+            constraint = _constraint_name(e)
+            if constraint == POST_FOREIGN_KEY:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Post with id {vote_data.post_id} does not exist"
+                )
+            if constraint == USER_FOREIGN_KEY:
+                # The user was deleted but is still in the principal cache
+                invalidate_principal(user_id)
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Could not validate credentials",
+                    headers={"WWW-Authenticate": "Bearer"}
+                )
+            raise
+
+        votes_count = result.scalar_one_or_none()
+        await db.commit()
+        if votes_count is not None:
+            feed_scores.mark([vote_data.post_id])
+            vote_stream.mark([vote_data.post_id])
+            await post_cache.invalidate_posts([vote_data.post_id])
+
         if vote_data.dir == 1:
-            if found_vote:
+            if votes_count is None:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"User {user_id} has already voted on post {vote_data.post_id}"
                 )
-            new_vote = Vote(post_id=vote_data.post_id, user_id=str(user_id)) 
-            db.add(new_vote)
-            db.commit()
             return {"message": "Successfully added vote"}
         else:
-            if not found_vote:
+            if votes_count is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Vote does not exist"
                 )
-            vote_query.delete(synchronize_session=False)
-            db.commit()
             return {"message": "Successfully deleted vote"}
+
+    @staticmethod
+    async def enqueue_vote(vote_data: VoteBase, user_id: UUID):
+        """
+        Buffers the vote toggle for the next batched flush.
+        """
+        await vote_buffer.add(user_id, vote_data.post_id, vote_data.dir)
+        return {"message": "Vote accepted"}
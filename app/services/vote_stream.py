@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Iterable
+from uuid import UUID
+
+import orjson
+from sqlalchemy import select
+
+from app.config.database import AsyncSessionLocal
+from app.config.settings import settings
+from app.models.post import Post
+from app.utils.bus import MessageBus, create_bus
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    One live connection: the posts it watches and the counts not yet sent.
+
+    Updates for the same post overwrite each other, so a slow client only
+    ever has one pending count per post.
+    """
+
+    def __init__(self):
+        self.post_ids = set()
+        self.pending = {}
+        self.ready = asyncio.Event()
+
+    def take(self) -> dict:
+        pending, self.pending = self.pending, {}
+        self.ready.clear()
+        return pending
+
+
+class VoteStream:
+    """
+    Pushes vote counts to subscribed clients, coalesced per post per tick.
+
+    Vote writers `mark` the posts they changed. Every `interval` seconds this
+    worker reads the current counts of the marked posts from the primary and
+    sends them to the bus as one message, then hands the counts received from
+    the bus (from every worker) to the subscribers watching those posts. A
+    post voted on a thousand times in a tick therefore costs one update per
+    subscriber, and as counts are read after the votes committed, a slow
+    writer cannot deliver an older count after a newer one.
+    """
+
+    def __init__(self, bus: MessageBus, interval: float, max_posts: int, session_factory=AsyncSessionLocal):
+        self.bus = bus
+        self.interval = interval
+        self.max_posts = max_posts
+        self.session_factory = session_factory
+        self._marked = set()
+        self._incoming = {}
+        self._subscribers = defaultdict(set)
+        self._task = None
+        self.marked = 0
+        self.ticks = 0
+        self.delivered = 0
+
+    def mark(self, post_ids: Iterable[UUID]):
+        """
+        Queues posts whose vote count changed for the next tick.
+        """
+        for post_id in post_ids:
+            self._marked.add(post_id)
+            self.marked += 1
+
+    def _receive(self, message: bytes):
+        self._incoming.update(orjson.loads(message))
+
+    def subscribe(self, subscriber: Subscriber, post_ids):
+        post_ids = {str(post_id) for post_id in post_ids} - subscriber.post_ids
+        if len(subscriber.post_ids) + len(post_ids) > self.max_posts:
+            raise ValueError(f"At most {self.max_posts} posts can be watched per connection")
+        for post_id in post_ids:
+            self._subscribers[post_id].add(subscriber)
+        subscriber.post_ids |= post_ids
+
+    def unsubscribe(self, subscriber: Subscriber, post_ids=None):
+        """
+        Stops watching `post_ids` (all of them when None).
+        """
+        post_ids = subscriber.post_ids.copy() if post_ids is None else {str(post_id) for post_id in post_ids}
+        for post_id in post_ids & subscriber.post_ids:
+            watchers = self._subscribers[post_id]
+            watchers.discard(subscriber)
+            if not watchers:
+                del self._subscribers[post_id]
+        subscriber.post_ids -= post_ids
+
+    async def tick(self):
+        """
+        Publishes the counts of this worker's marked posts, then delivers what
+        the bus brought in.
+        """
+        if self._marked:
+            marked, self._marked = self._marked, set()
+            try:
+                async with self.session_factory() as db:
+                    result = await db.execute(select(Post.id, Post.votes_count).filter(Post.id.in_(marked)))
+                    counts = {str(post_id): votes for post_id, votes in result.all()}
+            except Exception:
+                # Read them again on the next tick
+                self._marked |= marked
+                raise
+            if counts:
+                await self.bus.publish(orjson.dumps(counts))
+
+        if self._incoming:
+            incoming, self._incoming = self._incoming, {}
+            for post_id, votes in incoming.items():
+                for subscriber in self._subscribers.get(post_id, ()):
+                    subscriber.pending[post_id] = votes
+                    subscriber.ready.set()
+                    self.delivered += 1
+        self.ticks += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Vote stream tick failed")
+
+    async def start(self):
+        if self._task is None:
+            await self.bus.start(self._receive)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.bus.close()
+
+    def metrics(self) -> dict:
+        return {
+            "watched_posts": len(self._subscribers),
+            "marked": self.marked,
+            "ticks": self.ticks,
+            "delivered": self.delivered,
+        }
+
+
+vote_stream = VoteStream(
+    create_bus(settings.vote_stream_bus, settings.vote_stream_redis_url, channel="vote-counts"),
+    interval=settings.vote_stream_tick_ms / 1000,
+    max_posts=settings.vote_stream_max_posts
+)
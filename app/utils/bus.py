@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from app.utils.cache import RedisError, _RedisConnection, parse_redis_url
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], None]
+
+
+class MessageBus(ABC):
+    """
+    Broadcast channel between worker processes: every message published by
+    any worker is handed to the handler of every started worker.
+    """
+
+    @abstractmethod
+    async def publish(self, message: bytes):
+        ...
+
+    @abstractmethod
+    async def start(self, handler: MessageHandler):
+        ...
+
+    async def close(self):
+        pass
+
+
+class InProcessBus(MessageBus):
+    """
+    Delivers messages to the handlers started on this same instance, i.e.
+    within one process (a single worker, or several streams in tests).
+    """
+
+    def __init__(self):
+        self._handlers = []
+
+    async def publish(self, message):
+        for handler in list(self._handlers):
+            handler(message)
+
+    async def start(self, handler):
+        self._handlers.append(handler)
+
+    async def close(self):
+        self._handlers.clear()
+
+
+class RedisBus(MessageBus):
+    """
+    Fan-out across workers through Redis PUBLISH/SUBSCRIBE on one channel.
+
+    Like the Redis cache, failures are logged rather than raised: a lost
+    message only delays an update until the next one for the same post.
+    """
+
+    def __init__(self, url: str, channel: str, reconnect_delay: float = 1.0):
+        self.host, self.port, self.password, self.db = parse_redis_url(url)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._publisher: Optional[_RedisConnection] = None
+        self._publish_lock = None
+        self._listener = None
+
+    async def _connect(self) -> _RedisConnection:
+        return await _RedisConnection.open(self.host, self.port, self.password, self.db)
+
+    async def publish(self, message):
+        if self._publish_lock is None:
+            self._publish_lock = asyncio.Lock()
+
+        async with self._publish_lock:
+            try:
+                if self._publisher is None:
+                    self._publisher = await self._connect()
+                await self._publisher.execute("PUBLISH", self.channel, message)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, RedisError) as e:
+                logger.warning("Redis bus publish failed: %s", e)
+                if self._publisher is not None:
+                    self._publisher.close()
+                    self._publisher = None
+
+    async def _listen(self, handler: MessageHandler):
+        while True:
+            connection = None
+            try:
+                connection = await self._connect()
+                await connection.execute("SUBSCRIBE", self.channel)
+                while True:
+                    reply = await connection.read_reply()
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        try:
+                            handler(reply[2])
+                        except Exception:
+                            # A bad message must not cost the subscription
+                            logger.exception("Redis bus handler failed")
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, RedisError) as e:
+                logger.warning("Redis bus subscription lost: %s", e)
+            finally:
+                if connection is not None:
+                    connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self, handler):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(handler))
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._publisher is not None:
+            self._publisher.close()
+            self._publisher = None
+        self._publish_lock = None
+
+
+def create_bus(kind: str, redis_url: str, channel: str) -> MessageBus:
+    """
+    Builds the bus selected by the VOTE_STREAM_BUS setting.
+    """
+    if kind == "memory":
+        return InProcessBus()
+    if kind == "redis":
+        return RedisBus(redis_url, channel)
+    raise ValueError(f"Unknown message bus: {kind}")
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlparse
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Byte-oriented key/value store used for response caching.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    async def close(self):
+        pass
+
+
+class NullCacheBackend(CacheBackend):
+    """
+    Caching disabled: every read is a miss.
+    """
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value, ttl):
+        pass
+
+    async def delete(self, *keys):
+        pass
+
+    async def incr(self, key):
+        return 0
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Per-process LRU with TTL. Invalidations only reach the current worker,
+    so other workers may serve an entry until its TTL runs out.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._entries = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._counters = {}
+
+    async def get(self, key):
+        # Counters never expire and read back as bytes, like Redis INCR keys
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self._entries.get(key)
+
+    async def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._entries.pop(key)
+
+    async def incr(self, key):
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisError(Exception):
+    pass
+
+
+class _RedisConnection:
+    """
+    One connection speaking the Redis serialization protocol (RESP2).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: Optional[str], db: int):
+        reader, writer = await asyncio.open_connection(host, port)
+        connection = cls(reader, writer)
+        try:
+            if password:
+                await connection.execute("AUTH", password)
+            if db:
+                await connection.execute("SELECT", str(db))
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    async def execute(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.writer.write(b"".join(parts))
+        await self.writer.drain()
+        return await self.read_reply()
+
+    async def read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count == -1:
+                return None
+            return [await self.read_reply() for _ in range(count)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def close(self):
+        self.writer.close()
+
+
+def parse_redis_url(url: str) -> tuple:
+    """
+    (host, port, password, db) of a redis:// URL.
+    """
+    parsed = urlparse(url)
+    return parsed.hostname or "localhost", parsed.port or 6379, parsed.password, int(parsed.path.lstrip("/") or 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by all workers through any Redis-protocol server.
+
+    Connection failures are logged and treated as cache misses so the
+    cache can never take the API down.
+    """
+
+    def __init__(self, url: str, max_connections: int = 10):
+        self.host, self.port, self.password, self.db = parse_redis_url(url)
+        self.max_connections = max_connections
+        self._idle = []
+        self._slots = None
+
+    async def _execute(self, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await _RedisConnection.open(self.host, self.port, self.password, self.db)
+                reply = await connection.execute(*args)
+            except RedisError:
+                # An error reply leaves the connection usable
+                if connection is not None:
+                    self._idle.append(connection)
+                raise
+            except BaseException:
+                if connection is not None:
+                    connection.close()
+                raise
+            self._idle.append(connection)
+            return reply
+
+    async def _safe_execute(self, default, *args):
+        try:
+            return await self._execute(*args)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, RedisError) as e:
+            logger.warning("Redis cache command %s failed: %s", args[0], e)
+            return default
+
+    async def get(self, key):
+        return await self._safe_execute(None, "GET", key)
+
+    async def set(self, key, value, ttl):
+        await self._safe_execute(None, "SET", key, value, "PX", int(ttl * 1000))
+
+    async def delete(self, *keys):
+        if keys:
+            await self._safe_execute(0, "DEL", *keys)
+
+    async def incr(self, key):
+        return await self._safe_execute(0, "INCR", key)
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop().close()
+        self._slots = None
+
+
+def create_cache_backend(kind: str, redis_url: str, max_entries: int, ttl: float) -> CacheBackend:
+    """
+    Builds the backend selected by the CACHE_BACKEND setting.
+    """
+    if kind == "memory":
+        return InMemoryCacheBackend(max_entries=max_entries, ttl=ttl)
+    if kind == "redis":
+        return RedisCacheBackend(redis_url)
+    if kind == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown cache backend: {kind}")
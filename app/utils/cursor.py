@@ -0,0 +1,29 @@
+import base64
+import binascii
+import orjson
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(values, default=str)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Decode a cursor produced by encode_cursor back into its sort key values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return values
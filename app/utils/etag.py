@@ -0,0 +1,39 @@
+import hashlib
+from typing import Iterable, Optional
+
+import orjson
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag over the given values.
+    """
+    digest = hashlib.blake2b(orjson.dumps(parts, default=str), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def post_etag(version: int, votes_count: int) -> str:
+    return make_etag(version, votes_count)
+
+
+def page_etag(rows: Iterable[tuple]) -> str:
+    """
+    ETag of a feed page from its (id, version, votes_count, voted_by_me) rows,
+    in page order.
+    """
+    return make_etag(*(
+        (str(post_id), version, votes_count, voted_by_me)
+        for post_id, version, votes_count, voted_by_me in rows
+    ))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (weak comparison, as RFC 9110 prescribes for it).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
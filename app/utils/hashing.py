@@ -1,9 +1,2 @@
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str):
-    return pwd_context.hash(password)
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# Password helpers live in app.utils.security; re-exported for existing imports.
+from app.utils.security import pwd_context, hash_password, verify_password
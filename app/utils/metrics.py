@@ -0,0 +1,80 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client import REGISTRY, multiprocess
+
+# Per-worker by default; with PROMETHEUS_MULTIPROC_DIR set, /metrics merges
+# the samples of every gunicorn worker.
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class QueryStats:
+    """
+    SQL statements and time accumulated by the request being handled.
+    """
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+
+    @property
+    def route(self) -> Optional[str]:
+        """
+        Route template of the request, once routing has matched it.
+        """
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else None
+
+
+# Set by the request middleware and filled in by the engine's cursor hooks
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def record_query(elapsed: float):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def observe_request(method: str, route: str, status: int, started: float, stats: QueryStats):
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - started)
+    REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+    REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+
+
+def render_metrics() -> tuple:
+    """
+    Prometheus text exposition of every metric, with its content type.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,62 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Tracks how long requests wait to check a connection out of the pool.
+    """
+
+    def __init__(self, warning_ms: float):
+        self.warning_ms = warning_ms
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def record_wait(self, wait_ms: float, pool=None):
+        """
+        Record one checkout and log the pool state if it waited too long.
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+        if wait_ms >= self.warning_ms:
+            logger.warning(
+                "Waited %.1f ms for a database connection: %s",
+                wait_ms,
+                self.snapshot(pool) if pool is not None else {},
+            )
+
+    def record_timeout(self):
+        """
+        Record a checkout that gave up after the pool timeout.
+        """
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        """
+        Current pool occupancy plus the accumulated wait statistics.
+        """
+        with self._lock:
+            checkouts = self.checkouts
+            wait_total_ms = self.wait_total_ms
+            wait_max_ms = self.wait_max_ms
+            timeouts = self.timeouts
+
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_avg_ms": round(wait_total_ms / checkouts, 3) if checkouts else 0.0,
+            "wait_max_ms": round(wait_max_ms, 3),
+        }
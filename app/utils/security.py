@@ -1,7 +1,17 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from app.config.settings import settings
 
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds
+)
 
 def hash_password(password: str) -> str:
     """
@@ -14,3 +24,78 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verify a password against its hashed version.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasherPool:
+    """
+    Runs bcrypt in a dedicated process pool so a burst of logins cannot starve
+    the event loop or the shared threadpool.
+
+    At most `workers` hashes run at once and `max_queue` more may wait; beyond
+    that callers get an immediate 503 instead of queueing indefinitely.
+
+    If a child process dies (e.g. OOM-killed), the executor is broken for
+    good: the calls it fails get a 503 and the next call starts a new one.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._in_flight = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self._in_flight >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        self._in_flight += 1
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.bcrypt_workers,
+    max_queue=settings.bcrypt_max_queue
+)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt process pool.
+    """
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt process pool.
+    """
+    return await password_pool.run(verify_password, plain_password, hashed_password)
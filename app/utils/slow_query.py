@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from typing import Optional
+
+from app.utils.metrics import current_query_stats
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("app.slow_query")
+
+
+def _shape(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters, executemany: bool = False):
+    """
+    Types and sizes of the bound parameters; values are never logged.
+    """
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "shape": parameter_shapes(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: _shape(value) for name, value in parameters.items()}
+    return [_shape(value) for value in parameters or ()]
+
+
+class SlowQueryLog:
+    """
+    Logs statements slower than `threshold_ms` as one JSON line each.
+
+    With `explain` on, a follow-up entry carries the statement's plan, captured
+    in a background task on its own connection: EXPLAIN (ANALYZE, BUFFERS) for
+    SELECTs, plain EXPLAIN for anything that writes, since ANALYZE would run
+    it again. Each distinct statement is explained at most once per
+    `explain_interval` seconds, remembering at most `explain_max_statements`
+    of them.
+    """
+
+    def __init__(self, engine, threshold_ms: float, explain: bool, explain_interval: float, explain_timeout_ms: int, explain_max_statements: int = 1000):
+        self.engine = engine
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self._last_explained = TTLCache(maxsize=explain_max_statements, ttl=explain_interval)
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    def observe(self, statement: str, parameters, executemany: bool, elapsed: float):
+        duration_ms = elapsed * 1000
+        if self.threshold_ms <= 0 or duration_ms < self.threshold_ms or statement.startswith("EXPLAIN"):
+            return
+
+        stats = current_query_stats.get()
+        query_id = uuid.uuid4().hex
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "query_id": query_id,
+            "duration_ms": round(duration_ms, 2),
+            "route": stats.route if stats is not None else None,
+            "statement": statement,
+            "parameters": parameter_shapes(parameters, executemany),
+        }))
+
+        if self.explain and not executemany and self._should_explain(statement):
+            self._schedule_explain(query_id, statement, parameters)
+
+    def _should_explain(self, statement: str) -> bool:
+        with self._lock:
+            if self._last_explained.get(statement) is not None:
+                return False
+            self._last_explained.set(statement, True)
+            return True
+
+    def _schedule_explain(self, query_id: str, statement: str, parameters):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(query_id, statement, tuple(parameters or ())))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, query_id: str, statement: str, parameters: tuple) -> Optional[list]:
+        analyze = statement.lstrip().upper().startswith("SELECT")
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            async with self.engine.connect() as connection:
+                raw = await connection.get_raw_connection()
+                driver = raw.driver_connection
+                # Driver-level calls bypass the cursor hooks, so this is never logged itself
+                async with driver.transaction():
+                    await driver.execute(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    plan = await driver.fetchval(f"EXPLAIN ({options}) {statement}", *parameters)
+        except Exception as e:
+            logger.warning(json.dumps({"event": "slow_query_plan_failed", "query_id": query_id, "error": str(e)}))
+            return None
+
+        logger.warning(json.dumps({
+            "event": "slow_query_plan",
+            "query_id": query_id,
+            "analyze": analyze,
+            "plan": plan,
+        }, default=str))
+        return plan
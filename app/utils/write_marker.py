@@ -0,0 +1,31 @@
+from hashlib import blake2b
+from typing import Optional
+from app.utils.cache import CacheBackend
+
+
+class WriteMarker:
+    """
+    Remembers which clients wrote recently, keyed on their bearer token, so
+    their reads can go to the primary until the replica has caught up.
+
+    The markers live in a cache backend: with Redis every worker sees them,
+    with the in-memory backend only the worker that handled the write does.
+    """
+
+    def __init__(self, backend: CacheBackend, window: float):
+        self.backend = backend
+        self.window = window
+
+    @staticmethod
+    def key(client: str) -> str:
+        # Never store the token itself
+        return "recent-write:" + blake2b(client.encode(), digest_size=16).hexdigest()
+
+    async def mark(self, client: Optional[str]):
+        if client and self.window > 0:
+            await self.backend.set(self.key(client), b"1", self.window)
+
+    async def recent(self, client: Optional[str]) -> bool:
+        if not client or self.window <= 0:
+            return False
+        return await self.backend.get(self.key(client)) is not None
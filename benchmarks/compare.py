@@ -0,0 +1,57 @@
+"""
+Compare two load reports from benchmarks.load, endpoint by endpoint.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+
+METRICS = (
+    ("p50", lambda e: e["latency_ms"]["p50"]),
+    ("p95", lambda e: e["latency_ms"]["p95"]),
+    ("p99", lambda e: e["latency_ms"]["p99"]),
+    ("rps", lambda e: e["throughput_rps"]),
+    ("errors", lambda e: e["errors"]),
+)
+
+
+def _change(old: float, new: float) -> str:
+    if old == 0:
+        return "n/a" if new == 0 else "new"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(baseline: dict, candidate: dict) -> list:
+    """
+    Rows of (endpoint, metric, baseline, candidate, relative change).
+    """
+    rows = []
+    for endpoint in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        old, new = baseline["endpoints"].get(endpoint), candidate["endpoints"].get(endpoint)
+        if old is None or new is None:
+            rows.append((endpoint, "missing in " + ("baseline" if old is None else "candidate"), "", "", ""))
+            continue
+        for name, read in METRICS:
+            rows.append((endpoint, name, read(old), read(new), _change(read(old), read(new))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{'endpoint':<8} {'metric':<8} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for endpoint, metric, old, new, change in compare(baseline, candidate):
+        print(f"{endpoint:<8} {metric:<8} {old!s:>10} {new!s:>10} {change:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Drive the API at a fixed concurrency and report latency per endpoint.
+
+Log in as the seeded benchmark users (python -m benchmarks.seed), collect
+post ids from the feed, then keep --concurrency clients busy for --duration
+seconds with a weighted mix of:
+
+    login   POST /login
+    posts   GET  /posts/
+    post    GET  /posts/{id}   (post ids drawn with a Zipf skew: hot posts)
+    vote    POST /vote/        (toggles on the same skewed posts)
+
+The JSON report has p50/p95/p99 latency, throughput and status codes per
+endpoint, with stable key order so two runs can be diffed
+(python -m benchmarks.compare).
+
+Usage:
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --concurrency 32 --duration 30 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD, zipf_weights
+from benchmarks.stats import latency_summary
+
+# Business outcomes (already voted, vote missing) are answers, not failures
+EXPECTED_STATUSES = {200, 201, 202, 204, 404, 409}
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {"login", "posts", "post", "vote"}
+    if unknown:
+        raise ValueError(f"Unknown endpoints in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/login", data={"username": email, "password": BENCH_PASSWORD})
+
+
+async def fetch_post_ids(client: httpx.AsyncClient, headers: dict, count: int) -> list:
+    """
+    Walks the feed with its cursor until `count` post ids are collected.
+    """
+    post_ids, cursor = [], None
+    while len(post_ids) < count:
+        params = {"limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/posts/", params=params, headers=headers)
+        response.raise_for_status()
+        post_ids.extend(item["post"]["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    return post_ids[:count]
+
+
+class LoadRun:
+    def __init__(self, client, tokens, post_ids, mix, skew, seed):
+        self.client = client
+        self.tokens = tokens
+        self.post_ids = post_ids
+        self.post_weights = zipf_weights(len(post_ids), skew)
+        self.endpoints = list(mix)
+        self.endpoint_weights = list(mix.values())
+        self.rng = random.Random(seed)
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def _hot_post(self) -> str:
+        return self.rng.choices(self.post_ids, cum_weights=self.post_weights)[0]
+
+    async def _request(self, endpoint: str, worker: int) -> httpx.Response:
+        email, token = self.tokens[worker % len(self.tokens)]
+        headers = {"Authorization": f"Bearer {token}"}
+        if endpoint == "login":
+            return await login(self.client, email)
+        if endpoint == "posts":
+            return await self.client.get("/posts/", params={"limit": 20}, headers=headers)
+        if endpoint == "post":
+            return await self.client.get(f"/posts/{self._hot_post()}", headers=headers)
+        return await self.client.post(
+            "/vote/", json={"post_id": self._hot_post(), "dir": self.rng.choice((0, 1))}, headers=headers
+        )
+
+    async def _worker(self, worker: int, deadline: float):
+        while time.perf_counter() < deadline:
+            endpoint = self.rng.choices(self.endpoints, weights=self.endpoint_weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self._request(endpoint, worker)
+            except httpx.HTTPError as e:
+                self.errors[endpoint] += 1
+                self.statuses[endpoint][type(e).__name__] += 1
+                continue
+            self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            self.statuses[endpoint][str(response.status_code)] += 1
+            if response.status_code not in EXPECTED_STATUSES:
+                self.errors[endpoint] += 1
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(self._worker(worker, deadline) for worker in range(concurrency)))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        return {
+            endpoint: {
+                "requests": sum(self.statuses[endpoint].values()),
+                "errors": self.errors[endpoint],
+                "status_codes": dict(sorted(self.statuses[endpoint].items())),
+                "throughput_rps": round(sum(self.statuses[endpoint].values()) / elapsed, 2),
+                "latency_ms": latency_summary(self.latencies[endpoint]),
+            }
+            for endpoint in sorted(self.statuses)
+        }
+
+
+async def benchmark(args) -> dict:
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        emails = [BENCH_EMAIL.format(n) for n in range(args.users)]
+        responses = await asyncio.gather(*(login(client, email) for email in emails))
+        tokens = [
+            (email, response.json()["access_token"])
+            for email, response in zip(emails, responses) if response.status_code == 200
+        ]
+        if not tokens:
+            raise SystemExit("No benchmark user could log in; run python -m benchmarks.seed first")
+
+        post_ids = await fetch_post_ids(client, {"Authorization": f"Bearer {tokens[0][1]}"}, args.post_pool)
+        if not post_ids:
+            raise SystemExit("The feed is empty; run python -m benchmarks.seed first")
+
+        load = LoadRun(client, tokens, post_ids, mix, args.skew, args.seed)
+        elapsed = await load.run(args.concurrency, args.duration)
+
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+            "users": len(tokens),
+            "post_pool": len(post_ids),
+            "skew": args.skew,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": load.report(elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--mix", default="login=1,posts=10,post=20,vote=5", help="endpoint=weight,...")
+    parser.add_argument("--users", type=int, default=50, help="benchmark users to log in as")
+    parser.add_argument("--post-pool", type=int, default=1000, help="post ids to draw from")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for post popularity")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args))
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
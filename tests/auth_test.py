@@ -1,12 +1,15 @@
 import pytest
 import logging
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 from app.services.auth_service import AuthService
 from app.schemas.auth import TokenData
 from jose import jwt
 from fastapi import HTTPException, status
 from uuid import uuid4
-from app.utils.security import hash_password
+from app.utils.security import hash_password, verify_password, PasswordHasherPool
+from app.utils.ttl_cache import TTLCache
+from app.oauth2 import get_current_user, invalidate_principal
+from datetime import datetime, timezone
 
 # ✅ Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,7 +24,9 @@ ALGORITHM = settings.algorithm
 # ✅ Setup Mock Database Session
 @pytest.fixture
 def mock_db():
-    return MagicMock()
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    return db
 
 # ✅ Test Token Creation
 def test_create_access_token():
@@ -52,13 +57,14 @@ def test_verify_invalid_token():
     assert exc_info.value.status_code == 401
 
 # ✅ Test Login (Valid Credentials)
-def test_login_valid_user(mock_db):
+@pytest.mark.anyio
+async def test_login_valid_user(mock_db):
     user_mock = MagicMock()
     user_mock.id = uuid4()
     user_mock.email = "saad@gmail.com"
     user_mock.password = hash_password("saad")
 
-    mock_db.query().filter().first.return_value = user_mock
+    mock_db.execute.return_value.scalars.return_value.first.return_value = user_mock
 
     class MockOAuth2PasswordRequestForm:
         username = "saad@gmail.com"
@@ -66,20 +72,21 @@ def test_login_valid_user(mock_db):
 
     form_data = MockOAuth2PasswordRequestForm()
 
-    token = AuthService.login(form_data, mock_db)
+    token = await AuthService.login(form_data, mock_db)
 
     assert token.access_token is not None
     assert token.token_type == "bearer"
     assert token.id == str(user_mock.id)
 
 # ✅ Test Login (Invalid Password)
-def test_login_invalid_password(mock_db):
+@pytest.mark.anyio
+async def test_login_invalid_password(mock_db):
     user_mock = MagicMock()
     user_mock.id = uuid4()
     user_mock.email = "saad@gmail.com"
     user_mock.password = hash_password("saad")
 
-    mock_db.query().filter().first.return_value = user_mock
+    mock_db.execute.return_value.scalars.return_value.first.return_value = user_mock
 
     class MockOAuth2PasswordRequestForm:
         username = "saad@gmail.com"
@@ -88,14 +95,15 @@ def test_login_invalid_password(mock_db):
     form_data = MockOAuth2PasswordRequestForm()
 
     with pytest.raises(HTTPException) as exc_info:
-        AuthService.login(form_data, mock_db)
+        await AuthService.login(form_data, mock_db)
 
     assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
     assert exc_info.value.detail == "Invalid Credentials"
 
 # ✅ Test Login (User Not Found)
-def test_login_user_not_found(mock_db):
-    mock_db.query().filter().first.return_value = None
+@pytest.mark.anyio
+async def test_login_user_not_found(mock_db):
+    mock_db.execute.return_value.scalars.return_value.first.return_value = None
 
     class MockOAuth2PasswordRequestForm:
         username = "nonexistent@example.com"
@@ -104,7 +112,102 @@ def test_login_user_not_found(mock_db):
     form_data = MockOAuth2PasswordRequestForm()
 
     with pytest.raises(HTTPException) as exc_info:
-        AuthService.login(form_data, mock_db)
+        await AuthService.login(form_data, mock_db)
 
     assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
     assert exc_info.value.detail == "Invalid Credentials"
+
+# ✅ Test current user is served from the principal cache after the first lookup
+@pytest.mark.anyio
+async def test_get_current_user_uses_principal_cache(mock_db):
+    user_mock = MagicMock()
+    user_mock.id = uuid4()
+    user_mock.email = "saad@gmail.com"
+    user_mock.created_at = datetime.now(timezone.utc)
+    mock_db.execute.return_value.scalars.return_value.first.return_value = user_mock
+
+    token = AuthService.create_access_token(user_mock.id)
+
+    first = await get_current_user(token, mock_db)
+    second = await get_current_user(token, mock_db)
+
+    assert first.id == user_mock.id
+    assert second == first
+    assert mock_db.execute.call_count == 1
+
+    invalidate_principal(user_mock.id)
+    await get_current_user(token, mock_db)
+    assert mock_db.execute.call_count == 2
+
+# ✅ Test a request answered from the principal and post caches takes no pool connection
+@pytest.mark.anyio
+async def test_cached_request_checks_out_no_connection(seeded_client):
+    from app.config import database
+    from app.main import app
+
+    client, _, owners, posts = seeded_client
+    app.dependency_overrides.pop(get_current_user, None)
+    headers = {"Authorization": f"Bearer {AuthService.create_access_token(owners[0].id)}"}
+
+    assert (await client.get(f"/posts/{posts[0].id}", headers=headers)).status_code == 200
+    checkouts = database.pool_metrics.checkouts
+
+    assert (await client.get(f"/posts/{posts[0].id}", headers=headers)).status_code == 200
+    assert database.pool_metrics.checkouts == checkouts
+
+# ✅ Test principal cache entries expire and are evicted least recently used first
+def test_ttl_cache_expiry_and_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=-1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    cache.set("c", 3)
+    cache.set("d", 4)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache.get("d") == 4
+
+# ✅ Test bcrypt pool rejects work with 503 once workers and queue are full
+@pytest.mark.anyio
+async def test_password_pool_rejects_when_full():
+    pool = PasswordHasherPool(workers=1, max_queue=1)
+    pool._in_flight = 2
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(verify_password, "saad", "hash")
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+# ✅ Test bcrypt pool verifies passwords off the event loop
+@pytest.mark.anyio
+async def test_password_pool_verifies_password():
+    pool = PasswordHasherPool(workers=1, max_queue=0)
+    try:
+        assert await pool.run(verify_password, "saad", hash_password("saad"))
+        assert pool._in_flight == 0
+    finally:
+        pool.shutdown()
+
+# ✅ Test bcrypt pool replaces its executor after a child process dies
+@pytest.mark.anyio
+async def test_password_pool_recovers_from_dead_child():
+    pool = PasswordHasherPool(workers=1, max_queue=0)
+    hashed = hash_password("saad")
+    try:
+        assert await pool.run(verify_password, "saad", hashed)
+        for process in list(pool._executor._processes.values()):
+            process.kill()
+            process.join()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(verify_password, "saad", hashed)
+        assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+        assert await pool.run(verify_password, "saad", hashed)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,52 @@
+import pytest
+from benchmarks.compare import compare
+from benchmarks.load import parse_mix
+from benchmarks.seed import generate, zipf_weights
+from benchmarks.stats import percentile, latency_summary
+
+# ✅ Test nearest-rank percentiles
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
+    assert latency_summary([3.0, 1.0, 2.0])["p50"] == 2.0
+
+# ✅ Test the synthetic dataset is reproducible, consistent and skewed
+def test_generate_dataset_is_deterministic_and_skewed(monkeypatch):
+    monkeypatch.setattr("benchmarks.seed.hash_password", lambda password: "hashed")
+
+    users, posts, votes = generate(users=50, posts=200, votes=2000, skew=1.2, days=7, seed=7)
+    _, posts_again, votes_again = generate(users=50, posts=200, votes=2000, skew=1.2, days=7, seed=7)
+
+    assert [post[0] for post in posts] == [post[0] for post in posts_again]
+    assert sorted(votes) == sorted(votes_again)
+
+    assert len(users) == 50 and len(posts) == 200 and len(votes) == 2000
+    assert len(set(votes)) == len(votes)
+    assert sum(post[6] for post in posts) == len(votes)
+
+    counts = sorted((post[6] for post in posts), reverse=True)
+    assert counts[0] > 5 * counts[len(counts) // 2]
+    assert zipf_weights(3, 1.0) == [1.0, 1.5, 1.5 + 1 / 3]
+
+# ✅ Test the endpoint mix parser rejects unknown endpoints
+def test_parse_mix():
+    assert parse_mix("posts=10, vote=2") == {"posts": 10.0, "vote": 2.0}
+
+    with pytest.raises(ValueError):
+        parse_mix("posts=1,delete=1")
+
+# ✅ Test comparing two reports
+def test_compare_reports():
+    def report(p50, rps):
+        latency = {"p50": p50, "p95": p50 * 2, "p99": p50 * 3}
+        return {"endpoints": {"post": {"latency_ms": latency, "throughput_rps": rps, "errors": 0}}}
+
+    rows = compare(report(10, 100), report(5, 150))
+
+    assert ("post", "p50", 10, 5, "-50.0%") in rows
+    assert ("post", "rps", 100, 150, "+50.0%") in rows
+    assert ("post", "errors", 0, 0, "n/a") in rows
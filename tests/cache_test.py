@@ -0,0 +1,109 @@
+import socket
+import pytest
+from uuid import uuid4
+
+from app.services.post_cache import PostCache
+from app.utils.cache import InMemoryCacheBackend, RedisCacheBackend, NullCacheBackend
+
+# ✅ Test the in-process backend round-trips values and counters
+@pytest.mark.anyio
+async def test_in_memory_backend_get_set_delete_incr():
+    backend = InMemoryCacheBackend(max_entries=10, ttl=30)
+
+    await backend.set("key", b"value", 30)
+    assert await backend.get("key") == b"value"
+
+    await backend.delete("key")
+    assert await backend.get("key") is None
+
+    assert await backend.incr("counter") == 1
+    assert await backend.incr("counter") == 2
+    assert await backend.get("counter") == b"2"
+
+# ✅ Test the Redis-protocol backend against a local RESP server
+@pytest.mark.anyio
+async def test_redis_backend_against_stand_in(redis_stand_in):
+    backend = RedisCacheBackend(redis_stand_in)
+    try:
+        assert await backend.get("missing") is None
+
+        await backend.set("key", b"value\r\nwith-newline", 30)
+        assert await backend.get("key") == b"value\r\nwith-newline"
+
+        assert await backend.incr("counter") == 1
+        assert await backend.incr("counter") == 2
+
+        await backend.delete("key", "counter")
+        assert await backend.get("key") is None
+    finally:
+        await backend.close()
+
+# ✅ Test an unreachable Redis degrades to cache misses instead of errors
+@pytest.mark.anyio
+async def test_redis_backend_unreachable_is_a_miss():
+    # Nothing listens on a port freed right after binding it
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{port}/0")
+    assert await backend.get("key") is None
+    await backend.set("key", b"value", 30)
+    assert await backend.incr("counter") == 0
+
+# ✅ Test a post write retires the cached post and cached feed pages, even ones stored after it
+@pytest.mark.anyio
+async def test_post_cache_invalidation():
+    cache = PostCache(InMemoryCacheBackend(max_entries=10, ttl=30), ttl=30)
+    post_id = uuid4()
+
+    post_key = await cache.post_key(post_id)
+    await cache.set(post_key, b'{"votes":0}')
+    page_key = await cache.posts_key(10, 0, "", None)
+    await cache.set(page_key, b"[]", {"X-Next-Cursor": "abc"})
+
+    cached = await cache.get(page_key)
+    assert cached.body == b"[]"
+    assert cached.headers == {"X-Next-Cursor": "abc"}
+
+    await cache.invalidate_posts([post_id])
+
+    # A read that started before the write stores its body under the old key
+    await cache.set(post_key, b'{"votes":0}')
+    new_post_key = await cache.post_key(post_id)
+    assert new_post_key != post_key
+    assert await cache.get(new_post_key) is None
+    new_page_key = await cache.posts_key(10, 0, "", None)
+    assert new_page_key != page_key
+    assert await cache.get(new_page_key) is None
+
+# ✅ Test replica reads are not cached within the lag window of a write, while primary reads still are
+@pytest.mark.anyio
+async def test_post_cache_skips_replica_reads_after_a_write():
+    cache = PostCache(InMemoryCacheBackend(max_entries=10, ttl=30), ttl=30, replica_lag=5)
+    post_id = uuid4()
+    post_key = await cache.post_key(post_id)
+
+    await cache.set(post_key, b'{"votes":0}', replica=True)
+    assert await cache.get(post_key) is not None
+
+    await cache.invalidate_posts([post_id])
+    post_key = await cache.post_key(post_id)
+    page_key = await cache.posts_key(10, 0, "", None)
+
+    served = await cache.set(post_key, b'{"votes":0}', replica=True)
+    assert served.body == b'{"votes":0}'
+    assert await cache.get(post_key) is None
+    await cache.set(page_key, b"[]", replica=True)
+    assert await cache.get(page_key) is None
+
+    await cache.set(post_key, b'{"votes":1}')
+    assert (await cache.get(post_key)).body == b'{"votes":1}'
+
+# ✅ Test the null backend never serves a cached response
+@pytest.mark.anyio
+async def test_post_cache_disabled():
+    cache = PostCache(NullCacheBackend(), ttl=30)
+
+    await cache.set("post:1", b"{}")
+    assert await cache.get("post:1") is None
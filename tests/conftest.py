@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from sqlalchemy import event
+from app.config import database
+
+# ✅ Run async tests on asyncio only (anyio's plugin would also try trio)
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+# ✅ Fail when a block issues more SQL statements than its budget (catches N+1 queries)
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def budget(max_queries: int):
+        statements = []
+        # Reads may be routed to the replica engine; count both
+        engines = {database.engine.sync_engine, database.replica_engine.sync_engine}
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", record)
+
+        assert len(statements) <= max_queries, (
+            f"Expected at most {max_queries} queries, got {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return budget
+
+# ✅ Seed six posts from three owners and serve the app in-process as the first owner
+@pytest.fixture
+async def seeded_client():
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import delete
+    from app.main import app
+    from app.config import database
+    from app.models.user import User
+    from app.models.post import Post
+    from app.oauth2 import get_current_user
+
+    # Pooled connections belong to earlier tests' event loops; start a fresh pool
+    await database.engine.dispose(close=False)
+    await database.replica_engine.dispose(close=False)
+
+    word = f"seeded{uuid4().hex}"
+    async with database.AsyncSessionLocal() as db:
+        owners = [User(email=f"{uuid4().hex}@example.com", password="x") for _ in range(3)]
+        db.add_all(owners)
+        await db.flush()
+        posts = [Post(title=f"{word} {i}", content="content", owner_id=owners[i % 3].id) for i in range(6)]
+        db.add_all(posts)
+        await db.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: owners[0]
+    try:
+        # A bearer header lets read-your-writes pin reads after the client's writes
+        headers = {"Authorization": f"Bearer {word}"}
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+            yield client, word, owners, posts
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        async with database.AsyncSessionLocal() as db:
+            # Bulk delete so the database cascades to the posts
+            await db.execute(delete(User).filter(User.id.in_([owner.id for owner in owners])))
+            await db.commit()
+
+# ✅ Build a mock session factory whose sessions are the given mock db
+@pytest.fixture
+def session_factory_for():
+    def build(db):
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=db)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        return session_factory
+    return build
+
+# ✅ Minimal RESP server (GET/SET/DEL/INCR/PUBLISH/SUBSCRIBE) standing in for Redis; yields its URL
+@pytest.fixture
+async def redis_stand_in():
+    store = {}
+    subscribers = {}
+
+    async def read_command(reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def bulk(value):
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def handle(reader, writer):
+        while (args := await read_command(reader)) is not None:
+            command = args[0].upper()
+            if command == b"GET":
+                reply = bulk(store.get(args[1]))
+            elif command == b"SET":
+                store[args[1]] = args[2]
+                reply = b"+OK\r\n"
+            elif command == b"DEL":
+                removed = sum(store.pop(key, None) is not None for key in args[1:])
+                reply = b":%d\r\n" % removed
+            elif command == b"INCR":
+                store[args[1]] = str(int(store.get(args[1], b"0")) + 1).encode()
+                reply = b":%s\r\n" % store[args[1]]
+            elif command == b"SUBSCRIBE":
+                subscribers.setdefault(args[1], []).append(writer)
+                reply = b"*3\r\n" + bulk(b"subscribe") + bulk(args[1]) + b":1\r\n"
+            elif command == b"PUBLISH":
+                listeners = subscribers.get(args[1], [])
+                for listener in listeners:
+                    listener.write(b"*3\r\n" + bulk(b"message") + bulk(args[1]) + bulk(args[2]))
+                reply = b":%d\r\n" % len(listeners)
+            else:
+                reply = b"-ERR unknown command\r\n"
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    try:
+        yield f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0"
+    finally:
+        server.close()
+        await server.wait_closed()
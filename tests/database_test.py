@@ -2,10 +2,17 @@ import pytest
 import logging
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
+from asyncpg.exceptions import InvalidPasswordError
 from importlib import reload
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
 from app.config import database as database_module
-from app.config.database import engine, SessionLocal, get_db
+from app.config.database import engine, AsyncSessionLocal, get_db, get_read_db
 from app.config.settings import settings
+from app.utils.pool_metrics import PoolMetrics
+from app.utils.cache import InMemoryCacheBackend
+from app.utils.write_marker import WriteMarker
+from starlette.datastructures import State
 
 # ✅ Configure Logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -27,13 +34,20 @@ def test_database_url():
 
     logger.info("✅ Database connection URL is correctly formatted.")
 
+def _request(authorization=None):
+    # Outside a route: no route dependencies and no shared session yet
+    return MagicMock(headers={"authorization": authorization}, scope={}, state=State())
+
 # ✅ Test database connection
-def test_database_connection():
+@pytest.mark.anyio
+async def test_database_connection():
     logger.info("Testing database connection.")
+    # Connections pooled by an earlier test belong to its event loop
+    await engine.dispose(close=False)
 
     try:
-        with engine.connect() as connection:
-            result = connection.execute(text("SELECT 1"))
+        async with engine.connect() as connection:
+            result = await connection.execute(text("SELECT 1"))
             assert result.fetchone()[0] == 1
             logger.info("✅ Successfully connected to the database.")
     except OperationalError as e:
@@ -41,29 +55,185 @@ def test_database_connection():
         pytest.fail("Database connection failed.")
 
 # ✅ Test creating and closing a database session
-def test_get_db_session():
+@pytest.mark.anyio
+async def test_get_db_session():
     logger.info("Testing database session creation and closure.")
 
+    db_gen = get_db(_request())
     db = None
     try:
-        db = next(get_db())
+        db = await anext(db_gen)
         assert db is not None
         logger.info("✅ Successfully created a database session.")
     finally:
         if db:
-            db.close()
+            await db_gen.aclose()
             logger.info("✅ Database session closed successfully.")
 
 # ✅ Test failure with invalid credentials
-def test_invalid_database_credentials(monkeypatch):
+@pytest.mark.anyio
+async def test_invalid_database_credentials(monkeypatch):
     logger.info("Testing database connection with invalid credentials (should fail).")
 
     # Set incorrect credentials
     monkeypatch.setattr(settings, "database_password", "wrongpassword")
 
-    with pytest.raises(OperationalError):
-        reload(database_module)  # Reload the module to apply changes
-        with database_module.engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
+    # Reloading replaces the engine, session factory and Base; keep the originals
+    original_module = dict(vars(database_module))
+
+    # asyncpg reports authentication failures with its own exception type
+    try:
+        with pytest.raises((OperationalError, InvalidPasswordError)):
+            reload(database_module)  # Reload the module to apply changes
+            async with database_module.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+    finally:
+        # Put back the working engine for the tests that run after this one
+        vars(database_module).update(original_module)
+
+    logger.info("✅ Invalid database credentials caused expected connection error.")
+
+# ✅ Test pool metrics snapshot and wait accounting
+def test_pool_metrics_snapshot():
+    pool = MagicMock()
+    pool.size.return_value = 5
+    pool.checkedout.return_value = 3
+    pool.checkedin.return_value = 2
+    pool.overflow.return_value = -2
+
+    metrics = PoolMetrics(warning_ms=1000)
+    metrics.record_wait(10.0, pool)
+    metrics.record_wait(30.0, pool)
+    metrics.record_timeout()
+
+    snapshot = metrics.snapshot(pool)
+    assert snapshot["checked_out"] == 3
+    assert snapshot["idle"] == 2
+    assert snapshot["overflow"] == 0
+    assert snapshot["checkouts"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_avg_ms"] == 20.0
+    assert snapshot["wait_max_ms"] == 30.0
+
+# ✅ Test write markers expire and never store the token itself
+@pytest.mark.anyio
+async def test_write_marker():
+    backend = InMemoryCacheBackend(max_entries=10, ttl=30)
+    marker = WriteMarker(backend, window=30)
+
+    await marker.mark("Bearer token")
+    assert await marker.recent("Bearer token")
+    assert not await marker.recent("Bearer other")
+    assert not await marker.recent(None)
+    assert "token" not in marker.key("Bearer token")
+
+    await marker.mark(None)
+    assert await backend.get(marker.key("")) is None
+
+# ✅ Test reads go to the replica unless the client wrote recently
+@pytest.mark.anyio
+async def test_get_read_db_routing(monkeypatch):
+    def session_factory(name):
+        @asynccontextmanager
+        async def open_session():
+            yield MagicMock(info={}, name=name)
+        return open_session
+
+    marker = WriteMarker(InMemoryCacheBackend(max_entries=10, ttl=30), window=30)
+    monkeypatch.setattr(database_module, "REPLICA_CONFIGURED", True)
+    monkeypatch.setattr(database_module, "AsyncSessionLocal", session_factory("primary"))
+    monkeypatch.setattr(database_module, "ReplicaSessionLocal", session_factory("replica"))
+    monkeypatch.setattr(database_module, "write_marker", marker)
+
+    async def read_session(authorization):
+        db_gen = get_read_db(_request(authorization))
+        db = await anext(db_gen)
+        await db_gen.aclose()
+        return db
+
+    assert (await read_session("Bearer writer")).info["replica"] is True
+
+    await marker.mark("Bearer writer")
+    pinned = await read_session("Bearer writer")
+    assert pinned.info["replica"] is False
+    assert pinned.info["pinned"] is True
+    assert (await read_session("Bearer reader")).info["pinned"] is False
+    assert (await read_session("Bearer reader")).info["replica"] is True
 
-    logger.info("✅ Invalid database credentials caused expected OperationalError.")
+    monkeypatch.setattr(database_module, "REPLICA_CONFIGURED", False)
+    assert (await read_session("Bearer reader")).info["replica"] is False
+
+# ✅ Test sessions take a pool connection only when first used, and time that checkout
+@pytest.mark.anyio
+async def test_sessions_check_out_lazily(monkeypatch):
+    await engine.dispose(close=False)
+    metrics = PoolMetrics(warning_ms=1000)
+    monkeypatch.setattr(database_module, "pool_metrics", metrics)
+
+    db_gen = get_db(_request())
+    db = await anext(db_gen)
+    try:
+        assert engine.pool.checkedout() == 0
+        await db.execute(text("SELECT 1"))
+        assert engine.pool.checkedout() == 1
+        await db.execute(text("SELECT 1"))
+        assert metrics.checkouts == 1
+    finally:
+        await db_gen.aclose()
+    assert engine.pool.checkedout() == 0
+
+# ✅ Test read-your-writes against a real streaming replica (DATABASE_REPLICA_HOSTNAME)
+@pytest.mark.anyio
+@pytest.mark.skipif(not database_module.REPLICA_CONFIGURED, reason="no read replica configured")
+async def test_replica_read_your_writes(seeded_client):
+    client, word, owners, posts = seeded_client
+    await database_module.replica_engine.dispose(close=False)
+    headers = {"Authorization": f"Bearer {word}"}
+
+    async def in_recovery(authorization):
+        db_gen = get_read_db(_request(authorization))
+        db = await anext(db_gen)
+        try:
+            return (await db.execute(text("SELECT pg_is_in_recovery()"))).scalar()
+        finally:
+            await db_gen.aclose()
+
+    assert await in_recovery(headers["Authorization"]) is True
+
+    response = await client.post("/posts/", json={"title": word, "content": "content"}, headers=headers)
+    assert response.status_code == 201
+
+    # The writer now reads from the primary and sees its post straight away
+    assert await in_recovery(headers["Authorization"]) is False
+    response = await client.get(f"/posts/{response.json()['id']}", headers=headers)
+    assert response.status_code == 200
+
+    # Other clients keep reading from the replica
+    assert await in_recovery("Bearer someone-else") is True
+
+# ✅ Test a write route authenticates on its own primary session, so it needs a single connection
+@pytest.mark.anyio
+async def test_write_route_uses_one_connection(seeded_client, monkeypatch):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.main import app
+    from app.oauth2 import get_current_user, principal_cache
+    from app.services.auth_service import AuthService
+
+    client, word, owners, _ = seeded_client
+    small_engine = create_async_engine(
+        database_module.ASYNC_SQLALCHEMY_DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=2
+    )
+    monkeypatch.setattr(database_module, "AsyncSessionLocal", async_sessionmaker(
+        bind=small_engine, class_=AsyncSession, sync_session_class=database_module.TimedSession,
+        autoflush=False, expire_on_commit=False,
+    ))
+    app.dependency_overrides.pop(get_current_user, None)
+    principal_cache.pop(str(owners[0].id))
+    token = AuthService.create_access_token(owners[0].id)
+    try:
+        response = await client.post(
+            "/posts/", json={"title": word, "content": "content"}, headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 201
+    finally:
+        await small_engine.dispose()
@@ -0,0 +1,105 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, AsyncMock
+from uuid import uuid4
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from fastapi import status
+
+from app.models.post import Post
+from app.services.feed_scores import FeedScoreRefresher
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    db.commit = AsyncMock()
+    return db
+
+# ✅ Test marked posts are re-scored in batches of max_batch
+@pytest.mark.anyio
+async def test_refresh_scores_marked_posts_in_batches(mock_db, session_factory_for):
+    refresher = FeedScoreRefresher(interval=60, max_batch=2, session_factory=session_factory_for(mock_db))
+    refresher.mark([uuid4(), uuid4(), uuid4()])
+
+    assert await refresher.refresh() == 3
+    assert mock_db.execute.await_count == 2
+    assert refresher.metrics()["pending"] == 0
+
+    # Nothing marked and no window expiry due: no database work at all
+    assert await refresher.refresh() == 0
+    assert mock_db.execute.await_count == 2
+
+# ✅ Test a failed refresh keeps the posts marked for the next one
+@pytest.mark.anyio
+async def test_refresh_requeues_on_failure(mock_db, session_factory_for):
+    refresher = FeedScoreRefresher(interval=60, max_batch=100, session_factory=session_factory_for(mock_db))
+    mock_db.execute.side_effect = OperationalError("INSERT INTO post_scores", {}, Exception("boom"))
+    refresher.mark([uuid4()])
+
+    assert await refresher.refresh() == 0
+    assert refresher.metrics()["failed_refreshes"] == 1
+    assert refresher.metrics()["pending"] == 1
+
+# ✅ Test hot and top feeds rank from post_scores, and day/week windows drop old posts
+@pytest.mark.anyio
+async def test_ranked_feeds(seeded_client):
+    from app.config import database
+
+    client, _, _, posts = seeded_client
+    # Vote counts far above any other data so these posts lead every ranked feed
+    votes = [1_000_000 + i * 1000 for i in range(len(posts))]
+    old_post = posts[-1]
+    async with database.AsyncSessionLocal() as db:
+        for post, count in zip(posts, votes):
+            await db.execute(update(Post).filter(Post.id == post.id).values(votes_count=count))
+        await db.execute(
+            update(Post).filter(Post.id == old_post.id)
+            .values(created_at=datetime.now(timezone.utc) - timedelta(days=3))
+        )
+        await db.commit()
+
+    refresher = FeedScoreRefresher(interval=60, max_batch=100, session_factory=database.AsyncSessionLocal)
+    refresher.mark(post.id for post in posts)
+    assert await refresher.refresh() == len(posts)
+
+    def ids(response):
+        return [item["post"]["id"] for item in response.json()]
+
+    by_votes = [str(post.id) for post in sorted(posts, key=lambda p: -votes[posts.index(p)])]
+
+    response = await client.get("/posts/", params={"sort": "top", "limit": 6})
+    assert ids(response) == by_votes
+
+    response = await client.get("/posts/", params={"sort": "top", "window": "week", "limit": 6})
+    assert ids(response) == by_votes
+
+    response = await client.get("/posts/", params={"sort": "top", "window": "day", "limit": 5})
+    assert ids(response) == [post_id for post_id in by_votes if post_id != str(old_post.id)]
+
+    # Three days of age outweigh the old post's extra votes in the hot feed
+    response = await client.get("/posts/", params={"sort": "hot", "limit": 5})
+    assert ids(response) == by_votes[1:]
+
+    # Keyset paging continues after the cursor of a ranked page
+    first = await client.get("/posts/", params={"sort": "top", "limit": 3})
+    second = await client.get("/posts/", params={"sort": "top", "limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+    assert ids(first) + ids(second) == by_votes
+
+# ✅ Test search results cannot be re-sorted
+@pytest.mark.anyio
+async def test_search_cannot_be_sorted(seeded_client):
+    client, word, _, _ = seeded_client
+
+    response = await client.get("/posts/", params={"search": word, "sort": "hot"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# ✅ Test a window is refused for feeds it does not apply to
+@pytest.mark.anyio
+async def test_window_only_applies_to_top(seeded_client):
+    client, _, _, _ = seeded_client
+
+    for sort in ("hot", "new"):
+        response = await client.get("/posts/", params={"sort": sort, "window": "day"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,88 @@
+import subprocess
+import sys
+import pytest
+from unittest.mock import MagicMock
+from app import main as main_module
+from app.config.settings import settings
+from app.utils.cache import InMemoryCacheBackend
+from app.utils.write_marker import WriteMarker
+
+# ✅ Test importing the app loads neither the debugger nor the server runner
+def test_import_does_not_load_debug_or_server_modules():
+    snippet = "import sys, app.main; print(sorted(m for m in ('debugpy', 'uvicorn') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", snippet], check=True, capture_output=True, text=True).stdout
+
+    assert output.strip() == "[]"
+
+# ✅ Test startup leaves the schema to Alembic unless create_all is requested
+@pytest.mark.anyio
+async def test_lifespan_skips_create_all_by_default(monkeypatch):
+    engine = MagicMock(wraps=main_module.engine)
+    monkeypatch.setattr(main_module, "engine", engine)
+    monkeypatch.setattr(main_module, "REPLICA_CONFIGURED", False)
+    monkeypatch.setattr(settings, "database_create_schema", False)
+    monkeypatch.setattr(settings, "debugger_enabled", False)
+
+    async with main_module.lifespan(main_module.app):
+        pass
+
+    engine.begin.assert_not_called()
+
+# ✅ Test startup refuses a replica without a shared store for write markers
+@pytest.mark.anyio
+async def test_lifespan_requires_shared_write_markers_with_replica(monkeypatch):
+    monkeypatch.setattr(main_module, "REPLICA_CONFIGURED", True)
+    monkeypatch.setattr(settings, "cache_backend", "memory")
+    monkeypatch.setattr(settings, "debugger_enabled", False)
+
+    with pytest.raises(RuntimeError, match="CACHE_BACKEND=redis"):
+        async with main_module.lifespan(main_module.app):
+            pass
+
+# ✅ Test only routes that take a primary session pin the client's reads
+@pytest.mark.anyio
+async def test_read_only_posts_do_not_pin_reads(seeded_client, monkeypatch):
+    client, word, _, posts = seeded_client
+    marker = WriteMarker(InMemoryCacheBackend(max_entries=10, ttl=30), window=30)
+    monkeypatch.setattr(main_module, "REPLICA_CONFIGURED", True)
+    monkeypatch.setattr(main_module, "write_marker", marker)
+
+    response = await client.post("/posts/batch", json={"ids": [str(posts[0].id)]})
+    assert response.status_code == 200
+    assert not await marker.recent(f"Bearer {word}")
+
+    response = await client.post("/posts/", json={"title": word, "content": "content"})
+    assert response.status_code == 201
+    assert await marker.recent(f"Bearer {word}")
+
+# ✅ Test startup refuses several workers sharing live vote counts through the in-process bus
+@pytest.mark.anyio
+async def test_lifespan_requires_shared_bus_with_several_workers(monkeypatch):
+    monkeypatch.setattr(main_module, "REPLICA_CONFIGURED", False)
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    monkeypatch.setattr(settings, "vote_stream_bus", "memory")
+    monkeypatch.setattr(settings, "debugger_enabled", False)
+
+    with pytest.raises(RuntimeError, match="VOTE_STREAM_BUS=redis"):
+        async with main_module.lifespan(main_module.app):
+            pass
+
+# ✅ Test /internal endpoints are hidden without a token and require it once configured
+@pytest.mark.anyio
+async def test_internal_endpoints_require_token(monkeypatch):
+    from httpx import ASGITransport, AsyncClient
+
+    async with AsyncClient(transport=ASGITransport(app=main_module.app), base_url="http://test") as client:
+        monkeypatch.setattr(settings, "internal_token", None)
+        response = await client.get("/internal/vote-buffer")
+        assert response.status_code == 404
+
+        monkeypatch.setattr(settings, "internal_token", "s3cret")
+        response = await client.get("/internal/vote-buffer")
+        assert response.status_code == 401
+
+        response = await client.get("/internal/vote-buffer", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+
+        response = await client.get("/internal/vote-buffer", headers={"Authorization": "Bearer s3cret"})
+        assert response.status_code == 200
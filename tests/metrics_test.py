@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import text
+from app.config import database
+from app.utils.metrics import QueryStats, current_query_stats, REQUEST_QUERIES
+
+# ✅ Test the cursor hooks charge statements to the current request's stats
+@pytest.mark.anyio
+async def test_cursor_hooks_count_queries():
+    # Pooled connections belong to earlier tests' event loops; start a fresh pool
+    await database.engine.dispose(close=False)
+
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+            await db.execute(text("SELECT pg_sleep(0.01)"))
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.queries == 2
+    assert stats.db_time >= 0.01
+
+# ✅ Test statements outside a request are not charged to anything
+@pytest.mark.anyio
+async def test_cursor_hooks_ignore_queries_outside_requests():
+    await database.engine.dispose(close=False)
+
+    async with database.AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+
+    assert current_query_stats.get() is None
+
+# ✅ Test /metrics exposes per-route request, query and pool histograms
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_route_histograms(monkeypatch):
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+    from app.config.settings import settings
+
+    monkeypatch.setattr(settings, "internal_token", "s3cret")
+    await database.engine.dispose(close=False)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        before = REQUEST_QUERIES.labels("POST", "/login")._sum.get()
+        response = await client.post("/login", data={"username": "nobody@example.com", "password": "x"})
+        assert response.status_code == 403
+
+        response = await client.get("/metrics")
+        assert response.status_code == 401
+
+        response = await client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="POST",route="/login",status="403"}' in body
+    assert 'http_request_db_queries_count{method="POST",route="/login"}' in body
+    assert "db_pool_wait_seconds_count" in body
+    assert REQUEST_QUERIES.labels("POST", "/login")._sum.get() - before == 1
+
+# ✅ Test a streamed response is charged the statements its body runs
+@pytest.mark.anyio
+async def test_streamed_response_charges_body_queries(seeded_client):
+    client, _, owners, _ = seeded_client
+    params = {"owner_id": str(owners[0].id)}
+
+    # The first export caches the principal, so the next one queries only in its body
+    response = await client.get("/posts/export", params=params)
+    assert response.status_code == 200
+
+    before = REQUEST_QUERIES.labels("GET", "/posts/export")._sum.get()
+    response = await client.get("/posts/export", params=params)
+    assert response.status_code == 200
+
+    assert REQUEST_QUERIES.labels("GET", "/posts/export")._sum.get() - before >= 1
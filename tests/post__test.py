@@ -1,20 +1,28 @@
 import pytest
 import logging
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 from app.services.post_service import PostService
 from app.schemas.post import PostCreate, PostUpdate
 from app.models.post import Post
 from uuid import uuid4
+from datetime import datetime, timezone
+from app.utils.cursor import encode_cursor, decode_cursor
 from fastapi import HTTPException, status
+from sqlalchemy import update
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @pytest.fixture
 def mock_db():
-    return MagicMock()
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+    return db
 
-def test_create_post(mock_db):
+@pytest.mark.anyio
+async def test_create_post(mock_db):
     post_data = PostCreate(title="What a great day in Maimi!", content="Best day ever!!")
     current_user_id = uuid4()
     post_mock = MagicMock()
@@ -24,18 +32,304 @@ def test_create_post(mock_db):
     mock_db.commit.return_value = None
     mock_db.refresh.return_value = post_mock
 
-    new_post = PostService.create_post(post_data, mock_db, current_user_id)
+    new_post = await PostService.create_post(post_data, mock_db, current_user_id)
     assert new_post is not None # assert actual value of the post as id or title...
 
-def test_update_post_not_found(mock_db):
+@pytest.mark.anyio
+async def test_update_post_not_found(mock_db):
     post_id = uuid4()
     post_data = PostUpdate(title="What a bad day!!", content="Updated Content to a Bad day!")
 
-    mock_db.query().filter().first.return_value = None
+    mock_db.execute.return_value.scalars.return_value.first.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
-        PostService.update_post(post_id, post_data, mock_db, uuid4())
+        await PostService.update_post(post_id, post_data, mock_db, uuid4())
 
     assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
 
+# ✅ Test a single post reads its vote count from the post row in one query
+@pytest.mark.anyio
+async def test_get_post_reads_votes_count(mock_db):
+    post_mock = MagicMock()
+    post_mock.votes_count = 7
+
+    mock_db.execute.return_value.scalars.return_value.first.return_value = post_mock
+
+    result = await PostService.get_post(uuid4(), mock_db)
+
+    assert result == {"post": post_mock, "votes": 7}
+    assert mock_db.execute.call_count == 1
+
+# ✅ Test a full page returns a cursor to the row after its last post
+@pytest.mark.anyio
+async def test_get_posts_returns_next_cursor_for_full_page(mock_db):
+    post_mock = MagicMock()
+    post_mock.id = uuid4()
+    post_mock.created_at = datetime(2025, 2, 2, 18, 15, 14, 844394, tzinfo=timezone.utc)
+    post_mock.votes_count = 3
+
+    # Rows carry the post and voted_by_me, followed by the sort keys
+    mock_db.execute.return_value.all.return_value = [(post_mock, True, post_mock.created_at, post_mock.id)]
+
+    posts, next_cursor = await PostService.get_posts(mock_db, 1, 0, "", viewer_id=uuid4())
+
+    assert posts == [{"post": post_mock, "votes": 3, "voted_by_me": True}]
+    created_at, last_id = decode_cursor(next_cursor, 2)
+    assert datetime.fromisoformat(created_at) == post_mock.created_at
+    assert last_id == str(post_mock.id)
+
+# ✅ Test the last page returns no next cursor
+@pytest.mark.anyio
+async def test_get_posts_last_page_has_no_cursor(mock_db):
+    mock_db.execute.return_value.all.return_value = []
+
+    cursor = encode_cursor(datetime.now(timezone.utc), uuid4())
+    posts, next_cursor = await PostService.get_posts(mock_db, 10, 0, "", cursor)
+
+    assert posts == []
+    assert next_cursor is None
+
+# ✅ Test malformed cursors are rejected with 400
+@pytest.mark.anyio
+async def test_get_posts_invalid_cursor(mock_db):
+    with pytest.raises(HTTPException) as exc_info:
+        await PostService.get_posts(mock_db, 10, 0, "", "not-a-cursor")
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Well-formed cursor whose values have the wrong JSON types
+    for cursor in (encode_cursor("2025-01-01T00:00:00", 5), encode_cursor(5, str(uuid4()))):
+        with pytest.raises(HTTPException) as exc_info:
+            await PostService.get_posts(mock_db, 10, 0, "", cursor)
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+# ✅ Test search words become prefix terms of one tsquery
+def test_search_query_matches_word_prefixes():
+    ts_query = PostService._search_query("great day, Miami!")
+    compiled = ts_query.compile()
+
+    assert compiled.params["to_tsquery_2"] == "great:* & day:* & Miami:*"
+
+# ✅ Test a search with no words returns an empty page without querying
+@pytest.mark.anyio
+async def test_get_posts_search_without_words(mock_db):
+    posts, next_cursor = await PostService.get_posts(mock_db, 10, 0, "!!!")
+
+    assert posts == []
+    assert next_cursor is None
+    mock_db.execute.assert_not_called()
+
 # create all tests for the rest of the functions in services/post_service.py
+
+# ✅ Test listing posts loads their owners in the same query (no N+1)
+@pytest.mark.anyio
+async def test_get_posts_route_stays_within_query_budget(seeded_client, query_budget):
+    client, word, owners, _ = seeded_client
+
+    with query_budget(1):
+        response = await client.get("/posts/", params={"search": word})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert {post["post"]["owner"]["id"] for post in response.json()} == {str(owner.id) for owner in owners}
+
+# ✅ Test If-None-Match on a post is answered with 304 until the post changes
+@pytest.mark.anyio
+async def test_get_post_not_modified_until_voted(seeded_client, query_budget):
+    from app.config import database
+    from app.services.post_cache import post_cache
+
+    client, _, _, posts = seeded_client
+    url = f"/posts/{posts[0].id}"
+
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    with query_budget(1):
+        response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    async with database.AsyncSessionLocal() as db:
+        await db.execute(update(Post).filter(Post.id == posts[0].id).values(votes_count=Post.votes_count + 1))
+        await db.commit()
+    await post_cache.invalidate_posts([posts[0].id])
+
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["votes"] == 1
+
+# ✅ Test a feed page's ETag is matched by the light query used for If-None-Match
+@pytest.mark.anyio
+async def test_get_posts_not_modified(seeded_client):
+    client, word, _, _ = seeded_client
+
+    response = await client.get("/posts/", params={"search": word, "limit": 4})
+    etag = response.headers["ETag"]
+
+    response = await client.get("/posts/", params={"search": word, "limit": 4}, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = await client.get("/posts/", params={"search": word, "limit": 3}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+# ✅ Test the page serializer emits the same JSON as the response model
+def test_dump_posts_with_votes_matches_schema():
+    import json
+    from app.models.user import User
+    from app.schemas.post import PostWithVotes, dump_posts_with_votes
+
+    owner = User(id=uuid4(), email="owner@example.com", created_at=datetime.now(timezone.utc))
+    posts = []
+    for i in range(3):
+        post = Post(
+            id=uuid4(), title=f"Post {i}", content="content", published=True,
+            created_at=datetime.now(timezone.utc), owner_id=owner.id, votes_count=i
+        )
+        post.owner = owner
+        posts.append({"post": post, "votes": post.votes_count})
+
+    expected = [
+        json.loads(PostWithVotes.model_validate(post, from_attributes=True).model_dump_json())
+        for post in posts
+    ]
+    assert json.loads(dump_posts_with_votes(posts)) == expected
+
+# ✅ Test the NDJSON export streams one line per post, oldest first, in batches
+@pytest.mark.anyio
+async def test_export_posts_streams_ndjson(seeded_client):
+    import json
+    from app.config import database
+
+    client, word, owners, posts = seeded_client
+
+    response = await client.get("/posts/export", params={"owner_id": str(owners[0].id)})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # Seeded in one transaction, so the posts share created_at and tie-break on id
+    assert sorted(line["title"] for line in lines) == [f"{word} 0", f"{word} 3"]
+    assert [line["id"] for line in lines] == sorted(line["id"] for line in lines)
+    assert set(lines[0]) == {"id", "title", "content", "published", "created_at", "owner_id", "votes", "version"}
+    assert lines[0]["owner_id"] == str(owners[0].id)
+
+    chunks = [chunk async for chunk in PostService.export_posts(database.AsyncSessionLocal, owners[1].id, batch_size=1)]
+    assert len(chunks) == 2
+    assert all(chunk.count(b"\n") == 1 for chunk in chunks)
+
+# ✅ Test concurrent loader lookups share one IN query and are remembered
+@pytest.mark.anyio
+async def test_post_loader_coalesces_lookups(mock_db):
+    import asyncio
+    from app.services.post_loader import PostLoader
+
+    posts = [Post(id=uuid4(), title="Post", content="content", votes_count=i) for i in range(2)]
+    mock_db.execute.return_value.scalars.return_value = posts
+    missing = uuid4()
+
+    loader = PostLoader(mock_db)
+    first, second, again, unknown = await asyncio.gather(
+        loader.load(posts[0].id), loader.load(posts[1].id), loader.load(posts[0].id), loader.load(missing)
+    )
+
+    assert first["post"] is posts[0] and again is first
+    assert second["votes"] == 1
+    assert unknown is None
+    assert mock_db.execute.call_count == 1
+
+    assert await loader.load_many([posts[1].id, missing]) == [second, None]
+    assert mock_db.execute.call_count == 1
+
+    # The dispatch task is held until it finishes
+    await asyncio.sleep(0)
+    assert not loader._dispatches
+
+# ✅ Test a failed loader query reaches every waiting caller
+@pytest.mark.anyio
+async def test_post_loader_propagates_errors(mock_db):
+    import asyncio
+    from app.services.post_loader import PostLoader
+
+    mock_db.execute.side_effect = RuntimeError("connection lost")
+    loader = PostLoader(mock_db)
+
+    results = await asyncio.gather(loader.load(uuid4()), loader.load(uuid4()), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+# ✅ Test the batch endpoint returns the requested posts, in order, in one query
+@pytest.mark.anyio
+async def test_get_posts_batch(seeded_client, query_budget):
+    client, _, _, posts = seeded_client
+    ids = [str(posts[3].id), str(uuid4()), str(posts[1].id), str(posts[3].id)]
+
+    with query_budget(1):
+        response = await client.post("/posts/batch", json={"ids": ids})
+
+    assert response.status_code == 200
+    assert [post["post"]["id"] for post in response.json()] == [ids[0], ids[2]]
+    assert response.json()[0]["post"]["owner"]["id"] == str(posts[3].owner_id)
+
+    response = await client.post("/posts/batch", json={"ids": [str(uuid4()) for _ in range(101)]})
+    assert response.status_code == 422
+
+# ✅ Test voted_by_me is computed in the page query for every feed variant
+@pytest.mark.anyio
+async def test_get_posts_voted_by_me(seeded_client, query_budget):
+    client, word, owners, posts = seeded_client
+
+    response = await client.post("/vote/", json={"post_id": str(posts[2].id), "dir": 1})
+    assert response.status_code in (status.HTTP_201_CREATED, status.HTTP_202_ACCEPTED)
+
+    with query_budget(1):
+        response = await client.get("/posts/", params={"search": word})
+    voted = {post["post"]["id"]: post["voted_by_me"] for post in response.json()}
+    assert voted == {str(post.id): post is posts[2] for post in posts}
+
+    # The page ETag is per viewer: another user sees the same page unvoted
+    from app.config import database
+    async with database.AsyncSessionLocal() as db:
+        own = await PostService.get_posts_etag(db, 10, 0, word, viewer_id=owners[0].id)
+        other = await PostService.get_posts_etag(db, 10, 0, word, viewer_id=owners[1].id)
+    assert response.headers["ETag"] == own != other
+
+    # Ranked feeds carry the flag too
+    response = await client.get("/posts/", params={"sort": "top", "limit": 1})
+    assert response.status_code == 200
+    assert all(isinstance(post["voted_by_me"], bool) for post in response.json())
+
+# ✅ Test edits and deletes check ownership in the write itself (one statement when allowed)
+@pytest.mark.anyio
+async def test_update_and_delete_in_one_statement(seeded_client, query_budget):
+    client, word, owners, posts = seeded_client
+    own, others = posts[0], posts[1]
+    body = {"title": f"{word} edited", "content": "edited"}
+
+    with query_budget(1):
+        response = await client.put(f"/posts/{own.id}", json=body)
+    assert response.status_code == 200
+    assert response.json()["title"] == f"{word} edited"
+    assert response.json()["owner"]["email"] == owners[0].email
+
+    response = await client.get(f"/posts/{own.id}")
+    assert response.json()["post"]["title"] == f"{word} edited"
+
+    with query_budget(2):
+        response = await client.put(f"/posts/{others.id}", json=body)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = await client.put(f"/posts/{uuid4()}", json=body)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.delete(f"/posts/{others.id}")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    with query_budget(1):
+        response = await client.delete(f"/posts/{own.id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await client.delete(f"/posts/{own.id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
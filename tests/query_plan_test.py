@@ -0,0 +1,228 @@
+import json
+import pytest
+from contextlib import suppress
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, text, select
+from sqlalchemy.pool import NullPool
+
+from app.config import database
+from app.models.vote import Vote
+from app.schemas.post import PostUpdate
+from app.schemas.vote import VoteBase
+from app.services.auth_service import AuthService
+from app.services.feed_scores import refresh_statement, expire_statements
+from app.services.post_service import PostService
+from app.services.user_service import UserService
+from app.services.vote_buffer import FLUSH_STATEMENT
+from app.services.vote_service import VoteService
+from app.utils.cursor import encode_cursor
+
+# Tables a service query must never read with a sequential scan
+LARGE_TABLES = {"posts", "votes", "users", "post_scores"}
+
+SEED_USERS = 5000
+SEED_POSTS = 20000
+SEED_VOTES = 60000
+
+
+# ✅ Seed a sizeable, tagged dataset with fresh scores and statistics; yields a sync connection and sample ids
+@pytest.fixture(scope="module")
+def plan_db():
+    engine = create_engine(database.SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    tag = f"plan-{uuid4().hex[:12]}"
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO users (id, email, password)
+            SELECT gen_random_uuid(), :tag || '-' || i || '@example.com', 'x'
+            FROM generate_series(1, :users) AS i
+        """), {"tag": tag, "users": SEED_USERS})
+        conn.execute(text("""
+            WITH owners AS (SELECT array_agg(id) AS ids FROM users WHERE email LIKE :tag || '-%')
+            INSERT INTO posts (id, title, content, owner_id, created_at)
+            SELECT gen_random_uuid(), 'plan post ' || i, 'query plan content k' || i % 1000 || 'x',
+                   owners.ids[1 + i % array_length(owners.ids, 1)],
+                   now() - i * interval '2 minutes'
+            FROM owners, generate_series(1, :posts) AS i
+        """), {"tag": tag, "posts": SEED_POSTS})
+        conn.execute(text("""
+            WITH users_ AS (SELECT array_agg(id) AS ids FROM users WHERE email LIKE :tag || '-%'),
+                 posts_ AS (
+                     SELECT array_agg(p.id) AS ids FROM posts p JOIN users u ON u.id = p.owner_id
+                     WHERE u.email LIKE :tag || '-%'
+                 )
+            INSERT INTO votes (user_id, post_id)
+            SELECT users_.ids[1 + (i * 7919) % array_length(users_.ids, 1)],
+                   posts_.ids[1 + floor(power(random(), 3) * array_length(posts_.ids, 1))::int]
+            FROM users_, posts_, generate_series(1, :votes) AS i
+            ON CONFLICT DO NOTHING
+        """), {"tag": tag, "votes": SEED_VOTES})
+        conn.execute(text("""
+            UPDATE posts SET votes_count = counts.n
+            FROM (SELECT post_id, count(*) AS n FROM votes GROUP BY post_id) AS counts
+            WHERE posts.id = counts.post_id AND posts.votes_count <> counts.n
+        """))
+        post_ids = conn.execute(text("""
+            SELECT p.id FROM posts p JOIN users u ON u.id = p.owner_id WHERE u.email LIKE :tag || '-%'
+        """), {"tag": tag}).scalars().all()
+        conn.execute(refresh_statement(post_ids))
+        user_id, email = conn.execute(text("SELECT id, email FROM users WHERE email LIKE :tag || '-%' LIMIT 1"), {"tag": tag}).one()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE users, posts, votes, post_scores"))
+
+    try:
+        with engine.connect() as conn:
+            yield conn, {"user_id": user_id, "email": email, "post_ids": post_ids}
+    finally:
+        with engine.begin() as conn:
+            # Posts, votes and scores cascade from the users
+            conn.execute(text("DELETE FROM users WHERE email LIKE :tag || '-%'"), {"tag": tag})
+        engine.dispose()
+
+
+# ✅ (statement, params) pairs a service call executes against a recording session with empty results
+async def _captured(call) -> list:
+    statements = []
+
+    async def execute(statement, params=None, **kwargs):
+        statements.append((statement, params))
+        result = MagicMock()
+        result.all.return_value = []
+        result.first.return_value = None
+        result.scalars.return_value.first.return_value = None
+        result.scalars.return_value.__iter__.return_value = iter([])
+        result.scalar_one_or_none.return_value = None
+        return result
+
+    db = MagicMock(execute=execute, commit=AsyncMock(), rollback=AsyncMock())
+    with suppress(HTTPException):
+        await call(db)
+    return statements
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+# ✅ EXPLAIN (FORMAT JSON) of the compiled SQL, taken on the cursor just before it runs; writes are rolled back
+def _plan(conn, statement, params) -> dict:
+    plans = []
+
+    def explain(conn, cursor, sql, parameters, context, executemany):
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, parameters)
+        plans.append(cursor.fetchone()[0])
+
+    event.listen(conn, "before_cursor_execute", explain)
+    transaction = conn.begin()
+    try:
+        conn.execute(statement, params or {})
+    finally:
+        transaction.rollback()
+        event.remove(conn, "before_cursor_execute", explain)
+    return plans[0][0]["Plan"]
+
+
+def _assert_plan(conn, statement, params, indexes: set, max_cost: float):
+    plan = _plan(conn, statement, params)
+    nodes = list(_nodes(plan))
+    described = json.dumps(plan, indent=1)
+
+    seq_scans = {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"} & LARGE_TABLES
+    assert not seq_scans, f"Sequential scan on {seq_scans}:\n{described}"
+
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert indexes <= used, f"Expected indexes {indexes - used} to be used:\n{described}"
+
+    assert plan["Total Cost"] <= max_cost, f"Cost {plan['Total Cost']} over {max_cost}:\n{described}"
+
+
+def _service_cases(seed: dict) -> list:
+    """
+    (name, service call, indexes the plan must use, cost ceiling).
+    """
+    user_id, post_id, post_ids = seed["user_id"], seed["post_ids"][0], seed["post_ids"]
+    cursor = encode_cursor("2025-01-01T00:00:00+00:00", uuid4())
+    form = MagicMock(username=seed["email"], password="x")
+
+    return [
+        ("feed new", lambda db: PostService.get_posts(db, 10, 0, "", viewer_id=user_id),
+            {"ix_posts_created_at_id", "votes_pkey"}, 200),
+        ("feed new with offset", lambda db: PostService.get_posts(db, 10, 200, "", viewer_id=user_id),
+            {"ix_posts_created_at_id"}, 2500),
+        ("feed new after cursor", lambda db: PostService.get_posts(db, 10, 0, "", cursor, viewer_id=user_id),
+            {"ix_posts_created_at_id"}, 200),
+        ("feed search", lambda db: PostService.get_posts(db, 10, 0, "k7x", viewer_id=user_id),
+            {"ix_posts_search_vector"}, 5000),
+        ("feed hot", lambda db: PostService.get_posts(db, 10, 0, "", sort="hot", viewer_id=user_id),
+            {"ix_post_scores_hot", "posts_pkey"}, 200),
+        ("feed top day", lambda db: PostService.get_posts(db, 10, 0, "", sort="top", window="day", viewer_id=user_id),
+            {"ix_post_scores_top_day", "posts_pkey"}, 200),
+        ("feed top week", lambda db: PostService.get_posts(db, 10, 0, "", sort="top", window="week", viewer_id=user_id),
+            {"ix_post_scores_top_week", "posts_pkey"}, 200),
+        ("feed top all", lambda db: PostService.get_posts(db, 10, 0, "", sort="top", viewer_id=user_id),
+            {"ix_post_scores_score", "posts_pkey"}, 200),
+        ("feed etag", lambda db: PostService.get_posts_etag(db, 10, 0, "", viewer_id=user_id),
+            {"ix_posts_created_at_id"}, 200),
+        ("post by id", lambda db: PostService.get_post(post_id, db),
+            {"posts_pkey", "users_pkey"}, 50),
+        ("post etag", lambda db: PostService.get_post_etag(post_id, db),
+            {"posts_pkey"}, 50),
+        ("posts by ids", lambda db: PostService.get_posts_by_ids(post_ids[-20:], db),
+            {"posts_pkey", "users_pkey"}, 600),
+        ("update post", lambda db: PostService.update_post(post_id, PostUpdate(title="t", content="c"), db, user_id),
+            {"posts_pkey"}, 50),
+        ("delete post", lambda db: PostService.delete_post(post_id, db, user_id),
+            {"posts_pkey"}, 50),
+        ("vote", lambda db: VoteService.vote(VoteBase(post_id=post_id, dir=1), db, user_id),
+            {"posts_pkey"}, 100),
+        ("unvote", lambda db: VoteService.vote(VoteBase(post_id=post_id, dir=0), db, user_id),
+            {"posts_pkey", "votes_pkey"}, 100),
+        ("login by email", lambda db: AuthService.login(form, db),
+            {"users_email_key"}, 50),
+        ("user by id", lambda db: UserService.get_user(user_id, db),
+            {"users_pkey"}, 50),
+    ]
+
+
+# ✅ Test every statement the services run uses its index and stays under its cost ceiling
+@pytest.mark.anyio
+async def test_service_query_plans(plan_db):
+    conn, seed = plan_db
+
+    for name, call, indexes, max_cost in _service_cases(seed):
+        statements = await _captured(call)
+        assert statements, f"{name}: no statement executed"
+        for statement, params in statements:
+            try:
+                _assert_plan(conn, statement, params, indexes, max_cost)
+            except AssertionError as e:
+                raise AssertionError(f"{name}: {e}") from None
+
+
+# ✅ Test batch statements (vote buffer flush, feed score refresh and expiry) stay on indexes
+def test_background_query_plans(plan_db):
+    conn, seed = plan_db
+    # A typical tick's worth of changed posts
+    post_ids = seed["post_ids"][:100]
+    user_ids = [seed["user_id"]] * len(post_ids)
+
+    flush_params = {"user_ids": user_ids, "post_ids": post_ids, "dirs": [1] * len(post_ids)}
+    _assert_plan(conn, FLUSH_STATEMENT, flush_params, {"posts_pkey", "votes_pkey"}, 3000)
+    _assert_plan(conn, refresh_statement(post_ids), None, {"posts_pkey"}, 3000)
+    day, week = expire_statements()
+    _assert_plan(conn, day, None, {"ix_post_scores_top_day"}, 2000)
+    _assert_plan(conn, week, None, {"ix_post_scores_window_created_at"}, 2500)
+
+
+# ✅ Test cascading deletes find a post's votes and a user's posts through an index
+def test_foreign_key_lookup_plans(plan_db):
+    conn, seed = plan_db
+    from app.models.post import Post
+
+    _assert_plan(conn, select(Vote).filter(Vote.post_id == seed["post_ids"][-1]), None, {"ix_votes_post_id"}, 200)
+    _assert_plan(conn, select(Post.id).filter(Post.owner_id == seed["user_id"]), None, {"ix_posts_owner_id"}, 200)
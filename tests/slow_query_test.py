@@ -0,0 +1,62 @@
+import asyncio
+import json
+import logging
+import pytest
+from sqlalchemy import text
+from app.config import database
+from app.utils.slow_query import SlowQueryLog, parameter_shapes
+from app.utils.ttl_cache import TTLCache
+
+# ✅ Test parameter shapes describe types and sizes without values
+def test_parameter_shapes_hide_values():
+    assert parameter_shapes(("secret@example.com", 3, None, [1, 2])) == ["str(18)", "int", "null", "list[2]"]
+    assert parameter_shapes({"email": "secret@example.com"}) == {"email": "str(18)"}
+    assert parameter_shapes([(1, "a"), (2, "b")], executemany=True) == {"rows": 2, "shape": ["int", "str(1)"]}
+
+# ✅ Test a slow SELECT is logged as JSON and followed by its EXPLAIN ANALYZE plan
+@pytest.mark.anyio
+async def test_slow_select_is_logged_with_plan(monkeypatch, caplog):
+    await database.engine.dispose(close=False)
+    log = database.slow_query_log
+    monkeypatch.setattr(log, "threshold_ms", 5)
+    monkeypatch.setattr(log, "explain", True)
+    monkeypatch.setattr(log, "_last_explained", TTLCache(maxsize=10, ttl=60))
+
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": 0.02})
+        await asyncio.gather(*log._tasks)
+
+    entries = [json.loads(record.getMessage()) for record in caplog.records if record.name == "app.slow_query"]
+    slow = next(entry for entry in entries if entry["event"] == "slow_query")
+    plan = next(entry for entry in entries if entry["event"] == "slow_query_plan")
+
+    assert slow["duration_ms"] >= 5
+    assert slow["parameters"] == ["float"]
+    assert "pg_sleep" in slow["statement"]
+    assert plan["query_id"] == slow["query_id"]
+    assert plan["analyze"] is True
+    assert "Actual Total Time" in plan["plan"][0]["Plan"]
+
+# ✅ Test writes are only EXPLAINed, never re-executed with ANALYZE
+@pytest.mark.anyio
+async def test_write_statements_are_not_analyzed():
+    await database.engine.dispose(close=False)
+    log = database.slow_query_log
+
+    plan = await log._explain("id", "DELETE FROM votes WHERE post_id = $1::UUID", ("00000000-0000-0000-0000-000000000000",))
+
+    assert plan[0]["Plan"]["Node Type"] == "ModifyTable"
+    assert "Actual Total Time" not in plan[0]["Plan"]
+
+# ✅ Test explain throttling remembers a bounded number of distinct statements
+def test_explain_throttle_is_bounded():
+    log = SlowQueryLog(None, threshold_ms=5, explain=True, explain_interval=60, explain_timeout_ms=1000, explain_max_statements=2)
+
+    assert log._should_explain("SELECT 1")
+    assert not log._should_explain("SELECT 1")
+    assert log._should_explain("SELECT 2")
+    assert log._should_explain("SELECT 3")
+
+    assert len(log._last_explained) == 2
+    assert log._should_explain("SELECT 1")
@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.services.vote_stream import VoteStream, Subscriber
+from app.utils.bus import InProcessBus, RedisBus
+
+# ✅ Session factory whose queries return the given (post_id, votes_count) rows
+def _counts_db(counts: dict):
+    result = MagicMock()
+    result.all.side_effect = lambda: list(counts.items())
+    return MagicMock(execute=AsyncMock(return_value=result))
+
+# ✅ Test many votes on one worker reach another worker's subscriber as one message
+@pytest.mark.anyio
+async def test_updates_are_coalesced_per_tick_across_workers(session_factory_for):
+    watched, other = uuid4(), uuid4()
+    bus = InProcessBus()
+    db = _counts_db({watched: 100, other: 1})
+    worker_a = VoteStream(bus, interval=60, max_posts=10, session_factory=session_factory_for(db))
+    worker_b = VoteStream(bus, interval=60, max_posts=10)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        subscriber = Subscriber()
+        worker_b.subscribe(subscriber, [watched])
+
+        for _ in range(100):
+            worker_a.mark([watched])
+        worker_a.mark([other])
+
+        await worker_a.tick()
+        await worker_b.tick()
+
+        # The marked posts' counts are read once per tick
+        assert db.execute.await_count == 1
+        assert subscriber.ready.is_set()
+        assert subscriber.take() == {str(watched): 100}
+        assert not subscriber.ready.is_set()
+
+        await worker_b.tick()
+        assert subscriber.take() == {}
+    finally:
+        await worker_a.stop()
+        await worker_b.stop()
+
+# ✅ Test the per-connection watch limit and that unsubscribing drops empty entries
+def test_subscriptions_are_bounded_and_cleaned_up():
+    stream = VoteStream(InProcessBus(), interval=60, max_posts=2)
+    subscriber = Subscriber()
+    post_ids = [uuid4() for _ in range(3)]
+
+    stream.subscribe(subscriber, post_ids[:2])
+    stream.subscribe(subscriber, post_ids[:1])
+    with pytest.raises(ValueError):
+        stream.subscribe(subscriber, post_ids[2:])
+    assert stream.metrics()["watched_posts"] == 2
+
+    stream.unsubscribe(subscriber, post_ids[:1])
+    assert subscriber.post_ids == {str(post_ids[1])}
+
+    stream.unsubscribe(subscriber)
+    assert stream.metrics()["watched_posts"] == 0
+
+# ✅ Test the Redis bus fans a message out to every subscribed worker and survives a handler that raises
+@pytest.mark.anyio
+async def test_redis_bus_against_stand_in(redis_stand_in):
+    buses = [RedisBus(redis_stand_in, "votes"), RedisBus(redis_stand_in, "votes")]
+    received = [[], []]
+
+    def handler(inbox):
+        def handle(message):
+            if message == b"bad":
+                raise ValueError("bad message")
+            inbox.append(message)
+        return handle
+
+    try:
+        for bus, inbox in zip(buses, received):
+            await bus.start(handler(inbox))
+        # Wait for both subscriptions to be registered
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            await buses[0].publish(b"ping")
+            if all(received):
+                break
+
+        await buses[0].publish(b"bad")
+        await buses[0].publish(b'{"a":1}')
+        for _ in range(100):
+            if all(b'{"a":1}' in inbox for inbox in received):
+                break
+            await asyncio.sleep(0.01)
+        assert all(b'{"a":1}' in inbox for inbox in received)
+    finally:
+        for bus in buses:
+            await bus.close()
+
+# ✅ Test the WebSocket endpoint: auth, subscribe acknowledgement and coalesced pushes
+def test_websocket_stream(monkeypatch, session_factory_for):
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from starlette.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    from app.routers import vote
+    from app.services.auth_service import AuthService
+
+    post_id = str(uuid4())
+    stream = VoteStream(InProcessBus(), interval=0.02, max_posts=10, session_factory=session_factory_for(_counts_db({post_id: 3})))
+    monkeypatch.setattr(vote, "vote_stream", stream)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await stream.start()
+        yield
+        await stream.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(vote.router)
+    token = AuthService.create_access_token(uuid4())
+
+    def publish_burst():
+        for _ in range(3):
+            stream.mark([post_id])
+
+    with TestClient(app) as client:
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/vote/stream?token=invalid") as websocket:
+                websocket.receive_json()
+        assert exc_info.value.code == 1008
+
+        with client.websocket_connect(f"/vote/stream?token={token}") as websocket:
+            websocket.send_json({"subscribe": [post_id]})
+            assert websocket.receive_json() == {"watching": [post_id]}
+
+            for invalid in ({"subscribe": ["not-a-uuid"]}, {"subscribe": [5]}, {"subscribe": [{"id": 1}]}, {"unsubscribe": 5}, [post_id]):
+                websocket.send_json(invalid)
+                assert "error" in websocket.receive_json()
+            websocket.send_bytes(b'{"subscribe": []}')
+            assert websocket.receive_json() == {"error": "Expected a text frame"}
+
+            client.portal.call(publish_burst)
+            assert websocket.receive_json() == {"votes": {post_id: 3}}
+
+        assert stream.metrics()["watched_posts"] == 0
+
+# ✅ Test a committed vote publishes the post's count, read back from the database
+@pytest.mark.anyio
+async def test_vote_publishes_new_count(seeded_client, monkeypatch):
+    from app.services import vote_service
+
+    client, _, _, posts = seeded_client
+    stream = VoteStream(InProcessBus(), interval=60, max_posts=10)
+    monkeypatch.setattr(vote_service, "vote_stream", stream)
+    await stream.start()
+    try:
+        subscriber = Subscriber()
+        stream.subscribe(subscriber, [posts[0].id])
+
+        response = await client.post("/vote/", json={"post_id": str(posts[0].id), "dir": 1})
+        assert response.status_code == 201
+
+        await stream.tick()
+        assert subscriber.take() == {str(posts[0].id): 1}
+    finally:
+        await stream.stop()
@@ -1,38 +1,173 @@
 import pytest
 import logging
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 from app.services.vote_service import VoteService
+from app.services.vote_buffer import VoteBuffer
 from app.schemas.vote import VoteBase
 from app.models.vote import Vote
 from uuid import uuid4
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @pytest.fixture
 def mock_db():
-    return MagicMock()
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
 
-def test_vote_post_not_found(mock_db):
+def _fk_violation(constraint_name: str) -> IntegrityError:
+    # asyncpg's exception (carrying constraint_name) is the cause of the DBAPI error
+    driver_error = Exception("fk violation")
+    driver_error.constraint_name = constraint_name
+    dbapi_error = Exception("fk violation")
+    dbapi_error.__cause__ = driver_error
+    return IntegrityError("INSERT INTO votes", {}, dbapi_error)
+
+@pytest.mark.anyio
+async def test_vote_post_not_found(mock_db):
     vote_data = VoteBase(post_id=uuid4(), dir=1)
-    mock_db.query().filter().first.return_value = None
+    mock_db.execute.side_effect = _fk_violation("votes_post_id_fkey")
 
     with pytest.raises(HTTPException) as exc_info:
-        VoteService.vote(vote_data, mock_db, uuid4())
+        await VoteService.vote(vote_data, mock_db, uuid4())
 
     assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    mock_db.rollback.assert_awaited_once()
 
-def test_vote_already_voted(mock_db):
+# ✅ Test a vote by a user that no longer exists is rejected as unauthenticated, not 404
+@pytest.mark.anyio
+async def test_vote_deleted_user(mock_db):
+    vote_data = VoteBase(post_id=uuid4(), dir=1)
+    mock_db.execute.side_effect = _fk_violation("votes_user_id_fkey")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await VoteService.vote(vote_data, mock_db, uuid4())
+
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # Any other integrity error is not mistaken for a missing post
+    mock_db.execute.side_effect = IntegrityError("INSERT INTO votes", {}, Exception("other"))
+    with pytest.raises(IntegrityError):
+        await VoteService.vote(vote_data, mock_db, uuid4())
+
+@pytest.mark.anyio
+async def test_vote_already_voted(mock_db):
     vote_data = VoteBase(post_id=uuid4(), dir=1)
     user_id = uuid4()
-    vote_mock = MagicMock()
 
-    mock_db.query().filter().first.return_value = vote_mock
+    mock_db.execute.return_value.scalar_one_or_none.return_value = None
 
     with pytest.raises(HTTPException) as exc_info:
-        VoteService.vote(vote_data, mock_db, user_id)
+        await VoteService.vote(vote_data, mock_db, user_id)
 
     assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+
+# ✅ Test adding a vote takes a single statement
+@pytest.mark.anyio
+async def test_vote_added_in_one_statement(mock_db):
+    vote_data = VoteBase(post_id=uuid4(), dir=1)
+    mock_db.execute.return_value.scalar_one_or_none.return_value = 1
+
+    result = await VoteService.vote(vote_data, mock_db, uuid4())
+
+    assert result == {"message": "Successfully added vote"}
+    assert mock_db.execute.await_count == 1
+    mock_db.commit.assert_awaited_once()
+
+# ✅ Test removing a vote takes a single statement
+@pytest.mark.anyio
+async def test_vote_deleted(mock_db):
+    vote_data = VoteBase(post_id=uuid4(), dir=0)
+    mock_db.execute.return_value.scalar_one_or_none.return_value = 0
+
+    result = await VoteService.vote(vote_data, mock_db, uuid4())
+
+    assert result == {"message": "Successfully deleted vote"}
+    assert mock_db.execute.await_count == 1
+
+# ✅ Test removing a vote that does not exist answers 404
+@pytest.mark.anyio
+async def test_vote_delete_missing_vote(mock_db):
+    vote_data = VoteBase(post_id=uuid4(), dir=0)
+    mock_db.execute.return_value.scalar_one_or_none.return_value = None
+
+    with pytest.raises(HTTPException) as exc_info:
+        await VoteService.vote(vote_data, mock_db, uuid4())
+
+    assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+    assert exc_info.value.detail == "Vote does not exist"
+
+# ✅ Test the vote buffer flushes only the latest toggle per user and post
+@pytest.mark.anyio
+async def test_vote_buffer_keeps_latest_intent_per_user_and_post(mock_db, session_factory_for):
+    user_id, post_id, other_post_id = uuid4(), uuid4(), uuid4()
+    buffer = VoteBuffer(max_batch=100, flush_interval=60, max_pending=1000, session_factory=session_factory_for(mock_db))
+
+    await buffer.add(user_id, post_id, 1)
+    await buffer.add(user_id, post_id, 0)
+    await buffer.add(user_id, other_post_id, 1)
+    await buffer.flush()
+
+    params = mock_db.execute.await_args.args[1]
+    assert mock_db.execute.await_count == 1
+    assert params["post_ids"] == [post_id, other_post_id]
+    assert params["dirs"] == [0, 1]
+    assert buffer.metrics()["deduplicated"] == 1
+    assert buffer.metrics()["pending"] == 0
+
+# ✅ Test a failed flush puts its toggles back in the buffer
+@pytest.mark.anyio
+async def test_vote_buffer_requeues_failed_flush(mock_db, session_factory_for):
+    user_id, post_id = uuid4(), uuid4()
+    buffer = VoteBuffer(max_batch=100, flush_interval=60, max_pending=1000, session_factory=session_factory_for(mock_db))
+    mock_db.execute.side_effect = IntegrityError("WITH batch", {}, Exception("boom"))
+
+    await buffer.add(user_id, post_id, 1)
+    assert await buffer.flush() == []
+
+    metrics = buffer.metrics()
+    assert metrics["failed_flushes"] == 1
+    assert metrics["pending"] == 1
+
+# ✅ Test a full buffer refuses new toggles with 503 but still takes changes to pending ones
+@pytest.mark.anyio
+async def test_vote_buffer_rejects_when_full(mock_db, session_factory_for):
+    user_id, post_id = uuid4(), uuid4()
+    buffer = VoteBuffer(max_batch=100, flush_interval=60, max_pending=1, session_factory=session_factory_for(mock_db))
+
+    await buffer.add(user_id, post_id, 1)
+    with pytest.raises(HTTPException) as exc_info:
+        await buffer.add(user_id, uuid4(), 1)
+    await buffer.add(user_id, post_id, 0)
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert exc_info.value.headers["Retry-After"] == "1"
+    metrics = buffer.metrics()
+    assert metrics["pending"] == 1
+    assert metrics["rejected"] == 1
     
 # add tests for all cases
+
+# ✅ Test a buffered vote is accepted without checking out a database connection
+@pytest.mark.anyio
+async def test_buffered_vote_takes_no_connection(seeded_client, monkeypatch):
+    from app.config import database
+    from app.config.settings import settings
+    from app.services import vote_service
+
+    client, _, _, posts = seeded_client
+    buffer = VoteBuffer(max_batch=100, flush_interval=60)
+    monkeypatch.setattr(settings, "vote_buffer_enabled", True)
+    monkeypatch.setattr(vote_service, "vote_buffer", buffer)
+    checkouts = database.pool_metrics.checkouts
+
+    response = await client.post("/vote/", json={"post_id": str(posts[0].id), "dir": 1})
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert buffer.metrics()["pending"] == 1
+    assert database.pool_metrics.checkouts == checkouts